@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+UI/UX Pro Max Async API - asyncio front end for search and design-system generation
+
+Usage:
+    from async_api import asearch, asearch_stack, agenerate_design_system
+    result = await asearch("fintech dashboard", "style", 3)
+    text = await agenerate_design_system("SaaS dashboard", "My Project")
+
+Each coroutine runs the synchronous call from core / design_system in a
+bounded thread pool (ASYNC_WORKERS, env UIPRO_ASYNC_WORKERS), so scoring
+never blocks the event loop and a burst of requests cannot start more than
+ASYNC_WORKERS computations at once. Worker threads share this process's
+index and result caches.
+
+Identical requests that arrive while one is still running are coalesced
+(single-flight): they await the computation already in progress instead of
+starting another, and every caller receives the same result object - treat
+it as read-only. A caller being cancelled does not cancel the shared
+computation for the others.
+"""
+
+import asyncio
+import os
+import threading
+
+from core import MAX_RESULTS
+
+# ============ CONFIGURATION ============
+ASYNC_WORKERS = int(os.environ.get("UIPRO_ASYNC_WORKERS") or min(8, os.cpu_count() or 1))
+
+
+# ============ SINGLE FLIGHT ============
+_executor = None
+_executor_lock = threading.Lock()
+_flights = {}  # request key -> concurrent.futures.Future of the running computation
+_flights_lock = threading.Lock()
+_stats = {"started": 0, "coalesced": 0}
+
+
+def _get_executor():
+    """The shared worker pool, created on first use"""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            from concurrent.futures import ThreadPoolExecutor
+            _executor = ThreadPoolExecutor(max_workers=ASYNC_WORKERS, thread_name_prefix="uipro-async")
+        return _executor
+
+
+def _freeze(value):
+    """Hashable form of a request argument (filter dicts and value lists)"""
+    if isinstance(value, dict):
+        return tuple(sorted((str(key), _freeze(item)) for key, item in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+def _land(key, flight):
+    """Forget a finished computation so later requests start a fresh one"""
+    with _flights_lock:
+        if _flights.get(key) is flight:
+            del _flights[key]
+
+
+async def _single_flight(key, fn, *args):
+    """Await fn(*args) in the worker pool, joining an identical computation already running"""
+    with _flights_lock:
+        flight = _flights.get(key)
+        started = flight is None
+        if started:
+            flight = _flights[key] = _get_executor().submit(fn, *args)
+            _stats["started"] += 1
+        else:
+            _stats["coalesced"] += 1
+    if started:
+        # Outside the lock: runs immediately if the computation already finished
+        flight.add_done_callback(lambda done: _land(key, done))
+    return await asyncio.shield(asyncio.wrap_future(flight))
+
+
+def flight_info():
+    """Computations started, requests coalesced into them and computations still running"""
+    with _flights_lock:
+        return dict(_stats, in_flight=len(_flights))
+
+
+def shutdown(wait=True):
+    """Stop the worker pool (a later call creates a new one)"""
+    global _executor
+    with _executor_lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=wait)
+
+
+# ============ COROUTINES ============
+async def asearch(query, domain=None, max_results=MAX_RESULTS, filters=None):
+    """core.search() (or core.search_all() for domain "all") without blocking the event loop"""
+    if domain == "all":
+        from core import search_all
+        return await _single_flight(("search_all", query, max_results), search_all, query, max_results)
+    from core import search
+    key = ("search", query, domain, max_results, _freeze(filters))
+    return await _single_flight(key, search, query, domain, max_results, filters)
+
+
+async def asearch_stack(query, stack, max_results=MAX_RESULTS, filters=None):
+    """core.search_stack() without blocking the event loop"""
+    from core import search_stack
+    key = ("search_stack", query, stack, max_results, _freeze(filters))
+    return await _single_flight(key, search_stack, query, stack, max_results, filters)
+
+
+async def agenerate_design_system(query, project_name=None, output_format="ascii",
+                                  persist=False, page=None, output_dir=None):
+    """design_system.generate_design_system() without blocking the event loop"""
+    from design_system import generate_design_system
+    if persist:
+        # Resolve the default now: the worker thread must write where the caller would have
+        output_dir = os.path.abspath(output_dir or os.getcwd())
+    key = ("design_system", query, project_name, output_format, persist, _freeze(page), output_dir)
+    return await _single_flight(key, generate_design_system, query, project_name, output_format,
+                                persist, page, output_dir)
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+UI/UX Pro Max Batch - design systems for many projects in one run
+
+Usage: python search.py --batch projects.jsonl [--workers 4] [--persist] [-o out/] [-f markdown]
+       python search.py --batch projects.csv
+       python search.py --batch - < projects.jsonl
+
+Each input entry is one project: JSON lines
+  {"query": "fintech banking app", "project_name": "Acme Bank", "pages": ["dashboard", "checkout"]}
+or a CSV with query, project_name and pages columns (pages separated by ";").
+project_name and pages are optional.
+
+Projects are generated in a pool of worker processes. The parent warms the
+design-system indexes before the pool starts, so forked workers inherit them
+(prebuilt indexes are memory-mapped and shared through the page cache), and
+each worker's initializer warms whatever it did not inherit. Results are
+written as JSON lines as soon as each task (CHUNK_SIZE projects) completes,
+in completion order, with "line" giving the input entry they answer:
+  {"line": 1, "query": "...", "project_name": "...", "output": "...", "files": [...]}
+  {"line": 2, "error": "..."}
+"""
+
+import csv
+import json
+import os
+import sys
+
+# ============ CONFIGURATION ============
+BATCH_WORKERS = int(os.environ.get("UIPRO_BATCH_WORKERS") or os.cpu_count() or 1)
+CHUNK_SIZE = 4  # projects per task sent to a worker: amortizes inter-process overhead
+PENDING_PER_WORKER = 2  # tasks queued per worker; bounds memory on very long inputs
+PAGE_SEPARATOR = ";"  # between page names in CSV input
+
+
+# ============ INPUT ============
+def _job(line, entry):
+    """Normalize one input entry to a job dict, or an error result"""
+    if not isinstance(entry, dict):
+        return {"line": line, "error": "entry must be an object"}
+    query = (entry.get("query") or "").strip()
+    if not query:
+        return {"line": line, "error": "missing 'query'"}
+    pages = entry.get("pages") or []
+    if isinstance(pages, str):
+        pages = pages.split(PAGE_SEPARATOR)
+    return {
+        "line": line,
+        "query": query,
+        "project_name": (entry.get("project_name") or "").strip() or None,
+        "pages": [page.strip() for page in pages if page and page.strip()]
+    }
+
+
+def read_jobs(path):
+    """Yield a job dict (or an error result) per input entry of a JSONL or CSV file ("-": JSONL on stdin)"""
+    if path != "-" and str(path).lower().endswith(".csv"):
+        with open(path, 'r', encoding='utf-8', newline='') as f:
+            for line, row in enumerate(csv.DictReader(f), 1):
+                yield _job(line, row)
+        return
+    f = sys.stdin if path == "-" else open(path, 'r', encoding='utf-8')
+    try:
+        for line, text in enumerate(f, 1):
+            if not text.strip():
+                continue
+            try:
+                entry = json.loads(text)
+            except ValueError as exc:
+                yield {"line": line, "error": f"invalid JSON: {exc}"}
+                continue
+            yield _job(line, entry)
+    finally:
+        if f is not sys.stdin:
+            f.close()
+
+
+# ============ WORKERS ============
+def warm():
+    """Load the indexes design-system generation searches (SEARCH_CONFIG domains and ux)"""
+    from core import CSV_CONFIG, DATA_DIR, _INDEXES, source_options
+    from design_system import SEARCH_CONFIG
+
+    for domain in list(SEARCH_CONFIG) + ["ux"]:
+        config = CSV_CONFIG[domain]
+        filepath = DATA_DIR / config["file"]
+        if filepath.exists():
+            _INDEXES.get(filepath, config["search_cols"], config["output_cols"], source_options(config))
+
+
+def run_job(job, output_format="ascii", persist=False, output_dir=None):
+    """Generate (and optionally persist) one project's design system; returns its result dict"""
+    from design_system import _generate, format_ascii_box, format_markdown, persist_design_system
+
+    try:
+        design_system = _generate(job["query"], job["project_name"])
+        result = {"line": job["line"], "query": job["query"], "project_name": design_system["project_name"]}
+        result["output"] = format_markdown(design_system) if output_format == "markdown" else format_ascii_box(design_system)
+        if persist:
+            persisted = persist_design_system(design_system, job["pages"], output_dir, job["query"])
+            result["files"] = persisted["created_files"]
+        return result
+    except Exception as exc:  # one bad project must not end the batch
+        return {"line": job["line"], "error": f"{type(exc).__name__}: {exc}"}
+
+
+def run_jobs(jobs, output_format="ascii", persist=False, output_dir=None):
+    """Worker task: run_job() for a chunk of jobs"""
+    return [run_job(job, output_format, persist, output_dir) for job in jobs]
+
+
+def run_batch(jobs, workers=BATCH_WORKERS, output_format="ascii", persist=False, output_dir=None):
+    """Yield one result dict per job, each as soon as it completes.
+
+    workers <= 1 runs every job in this process. Error entries from
+    read_jobs() are passed through unchanged.
+    """
+    if persist:
+        # Workers must write where this process would have
+        output_dir = os.path.abspath(output_dir or os.getcwd())
+    warm()
+    if workers <= 1:
+        for job in jobs:
+            yield job if "error" in job else run_job(job, output_format, persist, output_dir)
+        return
+
+    from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+    with ProcessPoolExecutor(workers, initializer=warm) as pool:
+        pending = set()
+        chunk = []
+        for job in jobs:
+            if "error" in job:
+                yield job
+                continue
+            chunk.append(job)
+            if len(chunk) < CHUNK_SIZE:
+                continue
+            pending.add(pool.submit(run_jobs, chunk, output_format, persist, output_dir))
+            chunk = []
+            if len(pending) >= workers * PENDING_PER_WORKER:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield from future.result()
+        if chunk:
+            pending.add(pool.submit(run_jobs, chunk, output_format, persist, output_dir))
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield from future.result()
+
+
+def main(path, workers=BATCH_WORKERS, output_format="ascii", persist=False, output_dir=None, out=None):
+    """Stream batch results for path as JSON lines to out; a summary goes to stderr. Returns the error count."""
+    import time
+
+    out = out or sys.stdout
+    start = time.perf_counter()
+    done = errors = 0
+    for result in run_batch(read_jobs(path), workers, output_format, persist, output_dir):
+        out.write(json.dumps(result, ensure_ascii=False) + "\n")
+        out.flush()
+        done += 1
+        errors += "error" in result
+    seconds = time.perf_counter() - start
+    rate = done / seconds if seconds else 0.0
+    print(f"{done} projects ({errors} failed) in {seconds:.2f} s: {rate:.1f} projects/s with {max(workers, 1)} worker(s)",
+          file=sys.stderr)
+    return errors
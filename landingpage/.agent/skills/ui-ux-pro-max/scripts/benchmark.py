@@ -0,0 +1,542 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+UI/UX Pro Max Benchmarks - BM25 backends and engine hot paths
+
+Usage: python benchmark.py [--sizes 100,10000,100000,1000000] [--queries 200] [--batch 50] [--json]
+       python benchmark.py --suite [--scales 1,10,100,10000] [--domain color] [--save results.json]
+                           [--baseline baseline.json] [--threshold 0.25] [--json]
+       python benchmark.py --build [--workers 1,2,4,8] [--build-scale 100] [--domain style] [--json]
+       python benchmark.py --throughput [--workers 1,2,4,8] [--projects 96] [--json]
+
+Backend mode: synthetic rows are sampled from the real data/ vocabulary (term
+frequencies and document lengths), so postings have realistic skew at any
+corpus size. Each backend is timed on fit, full score(), top_k() and batched
+top_k_batch(), and the backends' results are cross-checked for identical
+rankings.
+
+Suite mode: times BM25.tokenize, BM25.fit, BM25.score and _search_csv on
+every domain's real rows (1x) and on synthetic copies of one domain's rows
+scaled 10x/100x/10000x, plus search_stack and generate_design_system end to
+end on the real data. Every metric is microseconds per operation, the
+median of --repeat runs after an untimed warm-up call. Each run is followed
+by an equally long fixed pure-Python calibration loop, and baseline
+comparisons divide by the calibration's ratio too, so a machine that is uniformly slower today
+(load, frequency scaling, a noisy neighbour) does not read as a
+regression. With --baseline, metrics slower than the baseline by more than
+--threshold are reported and the exit status is 1; metrics measured in
+fewer than MIN_COMPARE_RUNS runs (the 10000x scale) are shown but never
+fail the comparison.
+
+Build mode: times a full index build of one domain's CSV scaled by
+--build-scale, once in a single streaming pass (1 worker) and once per
+worker count sharded across processes (parallel_build.py), and checks that
+every sharded index equals the single-process one. Speedup is bounded by
+the CPU count, which is reported alongside.
+
+Throughput mode: runs batch.py's design-system batch (--projects distinct
+projects, every third with two persisted pages) once per worker count and
+reports projects per second, pool start-up included.
+"""
+
+import argparse
+import csv
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from core import BM25, CSV_CONFIG, DATA_DIR
+
+# ============ CONFIGURATION ============
+DEFAULT_SIZES = [100, 10000, 100000, 1000000]
+SEED = 42
+
+SUITE_SCALES = [1, 10, 100, 10000]
+SUITE_DOMAIN = "color"  # scaled domain; short rows: the 10000x CSV stays around 100 MB
+SUITE_QUERIES = 50  # at 1x; larger scales run proportionally fewer full-ranking queries
+MIN_RUN_S = 0.05  # fast metrics are looped to at least this long per run
+MIN_COMPARE_RUNS = 3  # metrics with fewer runs are too noisy to fail a baseline comparison
+DEFAULT_THRESHOLD = 0.25  # fail on metrics more than 25% slower than the baseline
+BUILD_WORKERS = [1, 2, 4, 8]
+BUILD_SCALE = 100
+BUILD_DOMAIN = "style"  # wide rows: 100x is a ~9 MB CSV
+THROUGHPUT_PROJECTS = 96
+DESIGN_SYSTEM_QUERIES = [
+    "saas analytics dashboard", "beauty spa wellness", "fintech banking app",
+    "ecommerce fashion store", "healthcare patient portal", "gaming community"
+]
+
+
+def _real_documents():
+    """Search-column documents from every CSV_CONFIG domain"""
+    documents = []
+    for config in CSV_CONFIG.values():
+        filepath = DATA_DIR / config["file"]
+        if not filepath.exists():
+            continue
+        with open(filepath, 'r', encoding='utf-8') as f:
+            for row in csv.DictReader(f):
+                documents.append(" ".join(str(row.get(col, "")) for col in config["search_cols"]))
+    return documents
+
+
+def synthetic_corpus(size, seed=SEED):
+    """Return (documents, queries_vocab) with size rows drawn from the real data's statistics"""
+    rng = random.Random(seed)
+    tokenized = [BM25().tokenize(doc) for doc in _real_documents()]
+    lengths = [len(tokens) for tokens in tokenized if tokens]
+    counts = {}
+    for tokens in tokenized:
+        for token in tokens:
+            counts[token] = counts.get(token, 0) + 1
+    vocab = list(counts)
+    weights = [counts[token] for token in vocab]
+    documents = [" ".join(rng.choices(vocab, weights, k=rng.choice(lengths))) for _ in range(size)]
+    return documents, vocab, weights
+
+
+def synthetic_queries(vocab, weights, count, seed=SEED):
+    """count queries of 1-4 terms, drawn with the corpus term distribution"""
+    rng = random.Random(seed + 1)
+    return [" ".join(rng.choices(vocab, weights, k=rng.randint(1, 4))) for _ in range(count)]
+
+
+def _timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def bench_backend(cls, documents, queries, batch, k=3):
+    """Time one backend; returns (metrics dict, top_k results for cross-checking)"""
+    bm25 = cls()
+    _, fit_s = _timed(lambda: bm25.fit(documents))
+    bm25.top_k(queries[0], k)  # warm lazy structures (upper bounds, weight matrix)
+
+    score_queries = queries[:max(1, len(queries) // 10)]
+    _, score_s = _timed(lambda: [bm25.score(q) for q in score_queries])
+    top, top_s = _timed(lambda: [bm25.top_k(q, k) for q in queries])
+    _, batch_s = _timed(lambda: [r for i in range(0, len(queries), batch) for r in bm25.top_k_batch(queries[i:i + batch], k)])
+
+    return {
+        "fit_s": round(fit_s, 4),
+        "score_qps": round(len(score_queries) / score_s, 1),
+        "top_k_qps": round(len(queries) / top_s, 1),
+        "top_k_batch_qps": round(len(queries) / batch_s, 1)
+    }, top
+
+
+def run(sizes, query_count, batch):
+    """Benchmark every available backend at each corpus size"""
+    backends = [("python", BM25)]
+    try:
+        from bm25_numpy import NumpyBM25
+        backends.append(("numpy", NumpyBM25))
+    except ImportError:
+        pass
+
+    report = []
+    for size in sizes:
+        documents, vocab, weights = synthetic_corpus(size)
+        queries = synthetic_queries(vocab, weights, query_count)
+        reference = None
+        for name, cls in backends:
+            metrics, top = bench_backend(cls, documents, queries, batch)
+            if reference is None:
+                reference = top
+            metrics.update({"size": size, "backend": name, "same_ranking": top == reference})
+            report.append(metrics)
+    return report
+
+
+def format_table(report):
+    """Render benchmark rows as a plain-text table"""
+    header = f"{'rows':>9} {'backend':<8} {'fit s':>8} {'score q/s':>10} {'top_k q/s':>10} {'batch q/s':>10}  same"
+    lines = [header, "-" * len(header)]
+    for r in report:
+        lines.append(f"{r['size']:>9} {r['backend']:<8} {r['fit_s']:>8.3f} {r['score_qps']:>10.1f} "
+                     f"{r['top_k_qps']:>10.1f} {r['top_k_batch_qps']:>10.1f}  {'yes' if r['same_ranking'] else 'NO'}")
+    return "\n".join(lines)
+
+
+# ============ HOT-PATH SUITE ============
+def _domain_rows(domain):
+    """Real rows of a CSV_CONFIG domain"""
+    with open(DATA_DIR / CSV_CONFIG[domain]["file"], 'r', encoding='utf-8') as f:
+        return list(csv.DictReader(f))
+
+
+def scaled_rows(domain, scale, seed=SEED):
+    """Rows for domain at scale x its real size.
+
+    1x is the real data. Larger corpora copy random real rows and replace each
+    search column with as many tokens drawn from the domain's vocabulary, so
+    output columns and per-column lengths stay realistic.
+    """
+    rows = _domain_rows(domain)
+    if scale == 1:
+        return rows
+    rng = random.Random(seed)
+    search_cols = CSV_CONFIG[domain]["search_cols"]
+    tokenize = BM25().tokenize
+    counts = {}
+    for row in rows:
+        for col in search_cols:
+            for token in tokenize(str(row.get(col, ""))):
+                counts[token] = counts.get(token, 0) + 1
+    vocab = list(counts)
+    weights = [counts[token] for token in vocab]
+    lengths = {col: [len(tokenize(str(row.get(col, "")))) for row in rows] for col in search_cols}
+
+    scaled = []
+    for _ in range(len(rows) * scale):
+        row = dict(rng.choice(rows))
+        for col in search_cols:
+            row[col] = " ".join(rng.choices(vocab, weights, k=rng.choice(lengths[col])))
+        scaled.append(row)
+    return scaled
+
+
+def _write_csv(rows, filepath):
+    """Write rows (sharing the first row's columns) as a CSV file"""
+    with open(filepath, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+_CALIBRATION_WORDS = [str(i) for i in range(2000)] * 5
+_calibration_loops = None  # sized on first use to run about MIN_RUN_S
+
+
+def _calibration():
+    """Fixed interpreter workload (dict updates over short strings), independent of the engine"""
+    counts = {}
+    for word in _CALIBRATION_WORDS:
+        counts[word] = counts.get(word, 0) + len(word)
+    return counts
+
+
+def _median(values):
+    values = sorted(values)
+    middle = len(values) // 2
+    return values[middle] if len(values) % 2 else (values[middle - 1] + values[middle]) / 2
+
+
+def _measure(fn, ops, repeat):
+    """Median timing over repeat runs of fn(), which performs ops operations.
+
+    A first, untimed call warms caches and lazy structures and sizes the
+    runs: every run loops fn() until it lasts about MIN_RUN_S, like timeit's
+    autorange. Each run is followed by an equally long run of _calibration()
+    (see compare()), so both see the same share of a contended CPU.
+    """
+    global _calibration_loops
+    if _calibration_loops is None:
+        _calibration()
+        _calibration_loops = max(1, int(MIN_RUN_S / max(_timed(_calibration)[1], 1e-9)))
+    _, warmup = _timed(fn)
+    loops = max(1, int(MIN_RUN_S / max(warmup, 1e-9)))
+    times = []
+    calibration = []
+    for _ in range(max(repeat, 1)):
+        start = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        times.append((time.perf_counter() - start) / loops)
+        start = time.perf_counter()
+        for _ in range(_calibration_loops):
+            _calibration()
+        calibration.append((time.perf_counter() - start) / _calibration_loops)
+    median = _median(times)
+    return {"ops": ops, "runs": len(times), "loops": loops, "seconds": round(median, 6),
+            "us_per_op": round(median / ops * 1e6, 3), "calibration_us": round(_median(calibration) * 1e6, 3)}
+
+
+def _suite_queries(domain, query_count):
+    """Synthetic queries drawn uniformly from domain's search-column vocabulary"""
+    search_cols = CSV_CONFIG[domain]["search_cols"]
+    tokenize = BM25().tokenize
+    vocab = sorted({token for row in _domain_rows(domain) for col in search_cols for token in tokenize(str(row.get(col, "")))})
+    return synthetic_queries(vocab, [1] * len(vocab), query_count)
+
+
+def _time_corpus(results, domain, scale, queries, repeat):
+    """Add tokenize/fit/score/index_build/_search_csv timings for domain at scale to results"""
+    from core import _search_csv, bm25_class, clear_index_cache, MAX_RESULTS
+
+    config = CSV_CONFIG[domain]
+    search_cols, output_cols = config["search_cols"], config["output_cols"]
+    rows = scaled_rows(domain, scale)
+    documents = [" ".join(str(row.get(col, "")) for col in search_cols) for row in rows]
+    # Full rankings and fits at 10000x take seconds each; keep those short
+    score_queries = queries[:max(3, len(queries) // scale)]
+    runs = repeat if scale <= 100 else 1
+    tag = f":{domain}@{scale}x"
+
+    bm25 = bm25_class(len(documents))()
+    results["tokenize" + tag] = _measure(lambda: [bm25.tokenize(doc) for doc in documents], len(documents), runs)
+    results["fit" + tag] = _measure(lambda: bm25.fit(documents), len(documents), runs)
+    results["score" + tag] = _measure(lambda: [bm25.score(q) for q in score_queries], len(score_queries), runs)
+    del bm25
+
+    with tempfile.TemporaryDirectory() as tmp:
+        filepath = DATA_DIR / config["file"] if scale == 1 else Path(tmp) / Path(config["file"]).name
+        if scale != 1:
+            _write_csv(rows, filepath)
+        del rows, documents
+        # Every call loads (or fits) the index from scratch
+        results["index_build" + tag] = _measure(
+            lambda: (clear_index_cache(), _search_csv(filepath, search_cols, output_cols, queries[0], MAX_RESULTS)), 1, runs)
+        # Queries against the warm registry
+        results["_search_csv" + tag] = _measure(
+            lambda: [_search_csv(filepath, search_cols, output_cols, q, MAX_RESULTS) for q in queries], len(queries), repeat)
+        clear_index_cache()
+
+
+def run_suite(scales=SUITE_SCALES, domain=SUITE_DOMAIN, query_count=SUITE_QUERIES, repeat=5):
+    """Time the engine hot paths; returns {"meta": ..., "results": {"<metric>:<domain>@<scale>x": timing}}"""
+    from core import search_stack, AVAILABLE_STACKS
+    from design_system import clear_design_cache, generate_design_system
+
+    results = {}
+    # Every domain's real data at 1x
+    domains = [name for name, config in CSV_CONFIG.items() if (DATA_DIR / config["file"]).exists()]
+    if 1 in scales:
+        for name in domains:
+            _time_corpus(results, name, 1, _suite_queries(name, query_count), repeat)
+    # One query set for every scale of the scaled domain, so per-op timings are comparable across scales
+    queries = _suite_queries(domain, query_count)
+    for scale in scales:
+        if scale != 1:
+            _time_corpus(results, domain, scale, queries, repeat)
+
+    # End to end on the real data, indexes warm
+    stack_queries = [(q, AVAILABLE_STACKS[i % len(AVAILABLE_STACKS)]) for i, q in enumerate(queries)]
+    results["search_stack"] = _measure(lambda: [search_stack(q, stack) for q, stack in stack_queries], len(stack_queries), repeat)
+    results["generate_design_system"] = _measure(
+        lambda: [generate_design_system(q) for q in DESIGN_SYSTEM_QUERIES], len(DESIGN_SYSTEM_QUERIES), repeat)
+    results["design_system_uncached"] = _measure(
+        lambda: [(clear_design_cache(), generate_design_system(q)) for q in DESIGN_SYSTEM_QUERIES],
+        len(DESIGN_SYSTEM_QUERIES), repeat)
+
+    meta = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "backend": os.environ.get("UIPRO_BM25_BACKEND", "auto"),
+        "domain": domain,
+        "domains": domains,
+        "scales": list(scales),
+        "created": time.strftime("%Y-%m-%d %H:%M:%S")
+    }
+    return {"meta": meta, "results": results}
+
+
+# ============ BUILD SCALING ============
+def run_build(workers=BUILD_WORKERS, scale=BUILD_SCALE, domain=BUILD_DOMAIN, repeat=3):
+    """Time index builds of domain at scale per worker count; returns {"meta": ..., "results": [...]}"""
+    from core import _stream_fit
+    from parallel_build import build_sharded
+
+    config = CSV_CONFIG[domain]
+    search_cols, output_cols = config["search_cols"], config["output_cols"]
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        filepath = Path(tmp) / Path(config["file"]).name
+        _write_csv(scaled_rows(domain, scale), filepath)
+        stat = filepath.stat()
+        signature = (stat.st_mtime_ns, stat.st_size)
+        serial = _stream_fit(filepath, search_cols, output_cols, signature)
+        reference = serial.bm25.to_state()
+
+        for n in workers:
+            if n == 1:
+                build = lambda: _stream_fit(filepath, search_cols, output_cols, signature)
+            else:
+                build = lambda: build_sharded(filepath, search_cols, output_cols, signature, n)
+            best = None
+            for _ in range(repeat):
+                entry, seconds = _timed(build)
+                best = seconds if best is None else min(best, seconds)
+            results.append({
+                "workers": n,
+                "seconds": round(best, 4),
+                "rows_per_s": round(len(entry.rows) / best),
+                "identical": entry.bm25.to_state() == reference and list(entry.rows.offsets) == list(serial.rows.offsets)
+            })
+
+    base = results[0]["seconds"] if results and results[0]["workers"] == 1 else None
+    for r in results:
+        r["speedup"] = round(base / r["seconds"], 2) if base else None
+    meta = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "domain": domain,
+        "scale": scale,
+        "rows": len(serial.rows),
+        "csv_bytes": signature[1]
+    }
+    return {"meta": meta, "results": results}
+
+
+def format_build(report):
+    """Render build-scaling results as a plain-text table"""
+    meta = report["meta"]
+    lines = [f"{meta['domain']} x{meta['scale']}: {meta['rows']} rows, {meta['csv_bytes'] / 1e6:.1f} MB, {meta['cpus']} CPU(s)",
+             f"{'workers':>7} {'seconds':>9} {'rows/s':>10} {'speedup':>8}  identical",
+             "-" * 48]
+    for r in report["results"]:
+        speedup = f"{r['speedup']:.2f}" if r["speedup"] else "-"
+        lines.append(f"{r['workers']:>7} {r['seconds']:>9.3f} {r['rows_per_s']:>10} {speedup:>8}  {'yes' if r['identical'] else 'NO'}")
+    return "\n".join(lines)
+
+
+# ============ BATCH THROUGHPUT ============
+def run_throughput(workers=BUILD_WORKERS, projects=THROUGHPUT_PROJECTS):
+    """Time batch.run_batch per worker count; returns {"meta": ..., "results": [...]}"""
+    from batch import run_batch
+
+    jobs = [{"line": i + 1, "query": DESIGN_SYSTEM_QUERIES[i % len(DESIGN_SYSTEM_QUERIES)],
+             "project_name": f"Project {i}", "pages": ["dashboard", "checkout"] if i % 3 == 0 else []}
+            for i in range(projects)]
+    results = []
+    reference = None
+    for n in workers:
+        with tempfile.TemporaryDirectory() as tmp:
+            # Distinct project names per run, so no worker starts with a memoized design system
+            run_jobs = [dict(job, project_name=f"{job['project_name']} w{n}") for job in jobs]
+            outputs, seconds = _timed(lambda: list(run_batch(run_jobs, n, persist=True, output_dir=tmp)))
+        outputs = {r["line"]: r.get("output", "").replace(r.get("project_name", ""), "") for r in outputs}
+        reference = reference or outputs
+        results.append({
+            "workers": n,
+            "seconds": round(seconds, 4),
+            "projects_per_s": round(projects / seconds, 1),
+            "identical": outputs == reference and len(outputs) == projects
+        })
+
+    base = results[0]["seconds"] if results and results[0]["workers"] == 1 else None
+    for r in results:
+        r["speedup"] = round(base / r["seconds"], 2) if base else None
+    meta = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "projects": projects
+    }
+    return {"meta": meta, "results": results}
+
+
+def format_throughput(report):
+    """Render batch throughput results as a plain-text table"""
+    meta = report["meta"]
+    lines = [f"{meta['projects']} projects, {meta['cpus']} CPU(s)",
+             f"{'workers':>7} {'seconds':>9} {'projects/s':>11} {'speedup':>8}  identical",
+             "-" * 49]
+    for r in report["results"]:
+        speedup = f"{r['speedup']:.2f}" if r["speedup"] else "-"
+        lines.append(f"{r['workers']:>7} {r['seconds']:>9.3f} {r['projects_per_s']:>11} {speedup:>8}  {'yes' if r['identical'] else 'NO'}")
+    return "\n".join(lines)
+
+
+def compare(results, baseline, threshold=DEFAULT_THRESHOLD):
+    """Metrics slower than baseline by more than threshold: [(metric, base_us, new_us, ratio)].
+
+    ratio is the slowdown relative to the calibration loop's (see _measure).
+    Only metrics measured in at least MIN_COMPARE_RUNS runs on both sides are compared.
+    """
+    regressions = []
+    for metric, timing in results.items():
+        base = baseline.get(metric)
+        if not base or not base["us_per_op"]:
+            continue
+        if min(timing["runs"], base.get("runs", 0)) < MIN_COMPARE_RUNS:
+            continue
+        ratio = _ratio(timing, base)
+        if ratio > 1 + threshold:
+            regressions.append((metric, base["us_per_op"], timing["us_per_op"], round(ratio, 3)))
+    return regressions
+
+
+def _ratio(timing, base):
+    """timing's us_per_op over base's, corrected by their calibration timings when both have one"""
+    ratio = timing["us_per_op"] / base["us_per_op"]
+    if timing.get("calibration_us") and base.get("calibration_us"):
+        ratio /= timing["calibration_us"] / base["calibration_us"]
+    return ratio
+
+
+def format_suite(report, baseline=None):
+    """Render suite results (and baseline ratios, if given) as a plain-text table"""
+    header = f"{'metric':<36} {'ops':>9} {'us/op':>12}" + (f" {'baseline':>12} {'ratio':>7}" if baseline else "")
+    lines = [header, "-" * len(header)]
+    for metric, timing in report["results"].items():
+        line = f"{metric:<36} {timing['ops']:>9} {timing['us_per_op']:>12.3f}"
+        base = (baseline or {}).get(metric)
+        if base:
+            line += f" {base['us_per_op']:>12.3f} {_ratio(timing, base):>7.2f}"
+        lines.append(line)
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="UI Pro Max BM25 backend and hot-path benchmarks")
+    parser.add_argument("--sizes", type=str, default=",".join(map(str, DEFAULT_SIZES)), help="Comma-separated corpus sizes")
+    parser.add_argument("--queries", type=int, default=200, help="Queries per size (default: 200)")
+    parser.add_argument("--batch", type=int, default=50, help="Queries per top_k_batch call (default: 50)")
+    parser.add_argument("--json", action="store_true", help="Output as JSON")
+    # Hot-path suite
+    parser.add_argument("--suite", action="store_true", help="Time the engine hot paths instead of comparing backends")
+    parser.add_argument("--scales", type=str, default=",".join(map(str, SUITE_SCALES)), help="Comma-separated corpus scales for --suite")
+    parser.add_argument("--domain", choices=list(CSV_CONFIG), default=None, help=f"Domain scaled beyond 1x by --suite / built by --build (default: {SUITE_DOMAIN} / {BUILD_DOMAIN})")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per metric after a warm-up call; the median is kept (default: 5)")
+    parser.add_argument("--save", type=str, default=None, help="Write --suite results as JSON to this file (e.g. to use as a baseline)")
+    parser.add_argument("--baseline", type=str, default=None, help="Compare --suite results against a saved JSON file")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="Allowed slowdown vs. baseline before failing (default: 0.25)")
+    # Build scaling
+    parser.add_argument("--build", action="store_true", help="Time single-process vs sharded index builds")
+    parser.add_argument("--workers", type=str, default=",".join(map(str, BUILD_WORKERS)), help="Comma-separated worker counts for --build / --throughput")
+    parser.add_argument("--build-scale", type=int, default=BUILD_SCALE, help=f"Corpus scale for --build (default: {BUILD_SCALE})")
+    # Batch throughput
+    parser.add_argument("--throughput", action="store_true", help="Time batch design-system generation per worker count")
+    parser.add_argument("--projects", type=int, default=THROUGHPUT_PROJECTS, help=f"Projects per --throughput run (default: {THROUGHPUT_PROJECTS})")
+    args = parser.parse_args()
+
+    if args.throughput:
+        report = run_throughput([int(w) for w in args.workers.split(",")], args.projects)
+        print(json.dumps(report, indent=2) if args.json else format_throughput(report))
+        sys.exit(0 if all(r["identical"] for r in report["results"]) else 1)
+
+    if args.build:
+        report = run_build([int(w) for w in args.workers.split(",")], args.build_scale, args.domain or BUILD_DOMAIN)
+        print(json.dumps(report, indent=2) if args.json else format_build(report))
+        sys.exit(0 if all(r["identical"] for r in report["results"]) else 1)
+
+    if not args.suite:
+        report = run([int(s) for s in args.sizes.split(",")], args.queries, args.batch)
+        print(json.dumps(report, indent=2) if args.json else format_table(report))
+        sys.exit(0)
+
+    report = run_suite([int(s) for s in args.scales.split(",")], args.domain or SUITE_DOMAIN, repeat=args.repeat)
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)["results"]
+        report["regressions"] = [
+            {"metric": m, "baseline_us": b, "us_per_op": n, "ratio": r}
+            for m, b, n, r in compare(report["results"], baseline, args.threshold)
+        ]
+    if args.save:
+        with open(args.save, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+    print(json.dumps(report, indent=2) if args.json else format_suite(report, baseline))
+    for regression in report.get("regressions", []):
+        if not args.json:
+            print(f"REGRESSION {regression['metric']}: {regression['baseline_us']} -> {regression['us_per_op']} us/op (x{regression['ratio']})")
+    sys.exit(1 if report.get("regressions") else 0)
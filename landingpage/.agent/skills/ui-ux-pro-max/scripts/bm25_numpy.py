@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+UI/UX Pro Max NumPy backend - vectorized BM25 scoring
+
+Keeps the fitted corpus as a sparse document-term weight matrix in CSC form
+(one column of precomputed BM25 weights per term, laid out like BM25's
+postings arrays). Scoring a query adds up the
+query terms' columns. Batches are scored query by query: every query's cost
+is already a handful of vectorized column adds, and a blocked product
+written with NumPy alone measured slower than that (see benchmark.py).
+core imports this module lazily and only when NumPy is installed.
+"""
+
+import numpy as np
+
+from core import BM25, tokenize_query
+
+
+class NumpyBM25(BM25):
+    """BM25 scored with NumPy over a sparse document-term weight matrix.
+
+    Columns are added in query-token order, the same order BM25._accumulate
+    uses, so scores are bit-identical to the pure-Python backend and rankings
+    (including tie order) match it exactly.
+    """
+
+    __slots__ = ("_matrix",)
+
+    def __init__(self, k1=1.5, b=0.75):
+        super().__init__(k1, b)
+        self._matrix = None
+
+    def fit_counts(self, shards):
+        """Build the postings index (fit() ends here too); the weight matrix is derived on first query"""
+        super().fit_counts(shards)
+        self._matrix = None
+
+    def refresh(self):
+        """Apply pending updates; the weight matrix is rebuilt on next use"""
+        changed = super().refresh()
+        if changed:
+            self._matrix = None
+        return changed
+
+    def _weights(self):
+        """Return (offsets, indices, data): term id t's column is indices/data[offsets[t]:offsets[t + 1]]"""
+        self.refresh()
+        if self._matrix is None:
+            offsets = self.offsets.tolist()
+            indices = np.frombuffer(self.doc_ids, dtype=np.dtype(self.doc_ids.typecode)).astype(np.int64)
+            tf = np.frombuffer(self.tfs, dtype=np.dtype(self.tfs.typecode)).astype(np.float64)
+            doc_freqs = np.frombuffer(self.doc_freqs, dtype=np.dtype(self.doc_freqs.typecode))
+            idf = np.repeat(np.frombuffer(self.idf, dtype=np.float64), doc_freqs)
+            norms = np.frombuffer(self.doc_norms, dtype=np.float64)
+            # Same expression, operand order and IEEE doubles as BM25._accumulate
+            data = idf * (tf * (self.k1 + 1)) / (tf + norms[indices])
+            self._matrix = (offsets, indices, data)
+        return self._matrix
+
+    def _accumulate_dense(self, query_tokens):
+        """Dense score vector for one query (0.0 where no query term occurs)"""
+        offsets, indices, data = self._weights()
+        scores = np.zeros(len(self.doc_lengths))
+        for token in query_tokens:
+            tid = self.term_ids.get(token)
+            if tid is not None:
+                start, end = offsets[tid], offsets[tid + 1]
+                scores[indices[start:end]] += data[start:end]
+        return scores
+
+    def _rank(self, scores):
+        """Full ranking in score() order: matches by score desc / doc id, then the rest"""
+        matched = np.flatnonzero(scores)
+        order = matched[np.lexsort((matched, -scores[matched]))]
+        ranked = list(zip(order.tolist(), scores[order].tolist()))
+        unmatched = np.ones(len(scores), dtype=bool)
+        unmatched[matched] = False
+        unmatched[list(self._deleted)] = False
+        ranked.extend((idx, 0) for idx in np.flatnonzero(unmatched).tolist())
+        return ranked
+
+    def _select(self, scores, k):
+        """Top k positive scores, ordered like top_k()"""
+        matched = np.flatnonzero(scores)
+        if k <= 0 or not len(matched):
+            return []
+        values = scores[matched]
+        if len(matched) > k:
+            # Keep everything tied with the k-th value so ties resolve by doc id
+            kth = np.partition(values, len(values) - k)[len(values) - k]
+            keep = values >= kth
+            matched, values = matched[keep], values[keep]
+        order = np.lexsort((matched, -values))[:k]
+        return list(zip(matched[order].tolist(), values[order].tolist()))
+
+    def score(self, query):
+        """Score all documents against query"""
+        return self._rank(self._accumulate_dense(tokenize_query(query)))
+
+    def top_k(self, query, k, docs=None):
+        """Return the k best (doc_id, score) pairs with score > 0, best first (among docs, if given)"""
+        scores = self._accumulate_dense(tokenize_query(query))
+        if docs is not None:
+            mask = np.zeros(len(scores), dtype=bool)
+            mask[np.asarray(docs, dtype=np.int64)] = True
+            scores[~mask] = 0.0
+        return self._select(scores, k)
+
+    def score_batch(self, queries):
+        """score() for several queries; one ranking per query"""
+        return [self.score(query) for query in queries]
+
+    def top_k_batch(self, queries, k):
+        """top_k() for several queries, each distinct query scored once"""
+        ranked = {}
+        for query in queries:
+            if query not in ranked:
+                ranked[query] = self.top_k(query, k)
+        return [ranked[query] for query in queries]
@@ -0,0 +1,305 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+UI/UX Pro Max Equivalence Check - incremental, streamed and sharded index builds vs fresh fits
+
+Usage: python check_equivalence.py [--check updates] [--trials 50] [--seed 1] [--json]
+
+Besides a fresh fit over csv.DictReader rows, an index can be reached
+incrementally, by streaming the file or across worker processes; each way must score exactly like a
+freshly fitted index over the same documents. Every check drives one of
+them with randomized inputs and compares the result against a fresh fit:
+
+  updates  BM25.add_documents / update_document / remove_document, with
+           copy() and to_state()/from_state() round trips in between:
+           score, top_k, top_k_batch, N and avgdl (for BM25 and, when
+           NumPy is installed, NumpyBM25)
+  appends  rows appended to a copy of a shipped CSV, folded into its index
+           by core._append_index: top_k hits, rows and facets
+  stream   random CSVs (quoted, multi-line and unicode fields, CRLF and bare
+           CR line breaks, duplicate headers, short and long rows) indexed
+           by core._build_index's streaming scanner vs core._fit_csv: rows
+           (also fetched out of order), scores and N
+  shards   copies of a shipped CSV with multi-line fields, CRLF or LF line
+           breaks, fitted by parallel_build.build_sharded with random worker
+           counts and scan block sizes vs a single streaming pass: BM25
+           state, rows, record offsets and CRC-32
+
+Exits 1 on any mismatch, so it can gate CI.
+"""
+
+import argparse
+import json
+import random
+import sys
+import tempfile
+from pathlib import Path
+
+import core
+
+# ============ CONFIGURATION ============
+VOCAB = ["dark", "mode", "dashboard", "button", "color", "accessibility", "react", "state", "hover", "form",
+         "glass", "minimal"]
+QUERIES_PER_TRIAL = 15
+MAX_FAILURES = 10  # per check; the rest are counted, not listed
+
+
+def _queries(rng, n, vocab=VOCAB):
+    """n random queries of 1-4 words, some with a word no document has"""
+    return [" ".join(rng.choices(vocab + ["zzz"], k=rng.randint(1, 4))) for _ in range(n)]
+
+
+def _facet_state(facets):
+    """Comparable (n_docs, {column: {value: doc ids}}) of a _FacetIndex, whatever its postings' form"""
+    if facets is None:
+        return None
+    return facets.n_docs, {col: {value: core._bitmap_ids(docs) if isinstance(docs, int) else list(docs)
+                                 for value, docs in values.items()}
+                           for col, values in facets.values.items()}
+
+
+# ============ INCREMENTAL UPDATES ============
+def check_updates(rng, trials, _tmp):
+    """Random add/update/remove sequences vs a fresh fit over the live documents"""
+    classes = [core.BM25]
+    try:
+        from bm25_numpy import NumpyBM25
+        classes.append(NumpyBM25)
+    except ImportError:
+        pass
+
+    def document():
+        text = " ".join(rng.choices(VOCAB, k=rng.randint(0, 12)))
+        return text + " long" * 5000 if rng.random() < 0.01 else text  # an outlier length
+
+    failures = []
+    for trial in range(trials):
+        cls = rng.choice(classes)
+        texts = [document() for _ in range(rng.randint(0, 30))]  # by doc id; None once removed
+        bm25 = cls()
+        bm25.fit(texts)
+        for _ in range(rng.randint(1, 15)):
+            live = [i for i, text in enumerate(texts) if text is not None]
+            op = rng.random()
+            if op < 0.4 or not live:
+                added = [document() for _ in range(rng.randint(1, 4))]
+                ids = bm25.add_documents(added)
+                if list(ids) != list(range(len(texts), len(texts) + len(added))):
+                    failures.append(f"{cls.__name__} trial {trial}: add_documents returned ids {list(ids)}")
+                texts += added
+            elif op < 0.7:
+                doc_id = rng.choice(live)
+                texts[doc_id] = document()
+                bm25.update_document(doc_id, texts[doc_id])
+            else:
+                doc_id = rng.choice(live)
+                texts[doc_id] = None
+                bm25.remove_document(doc_id)
+            if rng.random() < 0.3:
+                bm25.score("dark")  # refresh part-way through
+            if rng.random() < 0.1:
+                bm25 = bm25.copy()
+            if rng.random() < 0.1:
+                bm25 = cls.from_state(bm25.to_state())
+
+        live = [i for i, text in enumerate(texts) if text is not None]
+        fresh = cls()
+        fresh.fit([texts[i] for i in live])
+
+        def mapped(results):
+            return [(live[i], score) for i, score in results]
+
+        for query in _queries(rng, QUERIES_PER_TRIAL):
+            k = rng.randint(0, 8)
+            if bm25.score(query) != mapped(fresh.score(query)):
+                failures.append(f"{cls.__name__} trial {trial}: score({query!r})")
+            if bm25.top_k(query, k) != mapped(fresh.top_k(query, k)):
+                failures.append(f"{cls.__name__} trial {trial}: top_k({query!r}, {k})")
+            batch = [query, "dark mode"]
+            if bm25.top_k_batch(batch, k) != [mapped(r) for r in fresh.top_k_batch(batch, k)]:
+                failures.append(f"{cls.__name__} trial {trial}: top_k_batch({batch!r}, {k})")
+        if (bm25.N, bm25.avgdl) != (fresh.N, fresh.avgdl):
+            failures.append(f"{cls.__name__} trial {trial}: N/avgdl {bm25.N}/{bm25.avgdl} != {fresh.N}/{fresh.avgdl}")
+    return failures
+
+
+# ============ APPENDS ============
+def check_appends(rng, trials, tmp):
+    """Append the tail of a shipped CSV in chunks and compare the folded-in index with a rebuild"""
+    sources = [source for source in core.iter_sources() if source[1].exists()]
+    failures = []
+    appended = 0
+    for trial in range(trials):
+        name, filepath, search_cols, output_cols, options = rng.choice(sources)
+        lines = filepath.read_bytes().splitlines(keepends=True)
+        for _ in range(20):  # cut on a record boundary: after a newline, outside quotes
+            cut = rng.randint(2, len(lines))
+            head = b"".join(lines[:cut])
+            if head.endswith(b"\n") and head.count(b'"') % 2 == 0:
+                break
+        else:
+            continue
+        path = tmp / f"append_{trial}.csv"
+        path.write_bytes(head)
+        stat = path.stat()
+        entry = core._build_index(path, search_cols, output_cols, (stat.st_mtime_ns, stat.st_size), options)
+
+        tail = lines[cut:]
+        extra = [b"\n", b"Only,two\n", b'"multi\nline",x\n'] if rng.random() < 0.5 else []
+        for chunk in (tail[:len(tail) // 2], tail[len(tail) // 2:] + extra):
+            if not chunk:
+                continue
+            with open(path, 'ab') as f:
+                f.write(b"".join(chunk))
+            stat = path.stat()
+            signature = (stat.st_mtime_ns, stat.st_size)
+            updated = core._append_index(entry, path, search_cols, output_cols, signature, options)
+            if updated is None:
+                failures.append(f"{name} trial {trial}: append at byte {entry.signature[1]} fell back to a rebuild")
+                break
+            appended += 1
+            entry = updated
+            fresh = core._build_index(path, search_cols, output_cols, signature, options)
+            for query in _queries(rng, QUERIES_PER_TRIAL):
+                if entry.bm25.top_k(query, 5) != fresh.bm25.top_k(query, 5):
+                    failures.append(f"{name} trial {trial}: top_k({query!r}) after append")
+            all_ids = range(len(fresh.rows))
+            if len(entry.rows) != len(fresh.rows) or entry.rows.fetch(all_ids) != fresh.rows.fetch(all_ids):
+                failures.append(f"{name} trial {trial}: rows after append")
+            if _facet_state(entry.facets) != _facet_state(fresh.facets):
+                failures.append(f"{name} trial {trial}: facets after append")
+    if trials and not appended:
+        failures.append("no append was exercised")
+    return failures
+
+
+# ============ STREAMING ============
+_FIELDS = ["dark", "mode", "x", "é日本", "a,b", 'q"uote', "multi\nline", "cr\r\nlf", "", "  sp  "]
+
+
+def _random_csv(rng):
+    """CSV text with the quoting, line-break and row-width cases the streaming scanner must match"""
+    def field():
+        value = rng.choice(_FIELDS)
+        if any(c in value for c in ',"\n\r') or rng.random() < 0.2:
+            return '"' + value.replace('"', '""') + '"'
+        return value
+
+    header = rng.choice([["A", "B", "C"], ["A", "B", "A"], ["A", "B"], ["Z"], ["A", "B", "C", "D"]])
+    newline = rng.choice(["\n", "\r\n"])
+    lines = [",".join(header)]
+    for _ in range(rng.randint(0, 12)):
+        lines.append("" if rng.random() < 0.1 else ",".join(field() for _ in range(rng.randint(1, 5))))
+    text = newline.join(lines) + (newline if rng.random() < 0.7 else "")
+    return text.replace("\n", "\r") if rng.random() < 0.05 else text  # bare CR: the eager loader's case
+
+
+def check_stream(rng, trials, tmp):
+    """Random CSVs through _build_index (streaming scanner) vs _fit_csv (csv.DictReader)"""
+    failures = []
+    for trial in range(trials):
+        path = tmp / f"stream_{trial}.csv"
+        path.write_bytes(_random_csv(rng).encode())
+        search_cols = rng.sample(["A", "B", "C", "Q"], 2)
+        output_cols = rng.sample(["A", "B", "C", "D", "Q"], 3)
+        want, fresh, _ = core._fit_csv(path, search_cols, output_cols)
+        stat = path.stat()
+        entry = core._build_index(path, search_cols, output_cols, (stat.st_mtime_ns, stat.st_size))
+        if entry.rows.fetch(range(len(entry.rows))) != want:
+            failures.append(f"trial {trial}: rows of {path.read_bytes()[:80]!r}")
+        ids = list(range(len(want)))
+        rng.shuffle(ids)
+        if entry.rows.fetch(ids) != [want[i] for i in ids]:
+            failures.append(f"trial {trial}: rows fetched out of order")
+        if entry.bm25.N != fresh.N or entry.bm25.score("dark mode x") != fresh.score("dark mode x"):
+            failures.append(f"trial {trial}: scores of {path.read_bytes()[:80]!r}")
+    return failures
+
+
+# ============ SHARDED BUILDS ============
+def check_shards(rng, trials, tmp):
+    """Sharded builds of randomized shipped-CSV copies vs a single-process streaming fit"""
+    import csv
+    import parallel_build
+
+    block = parallel_build._BLOCK
+    failures = []
+    try:
+        for trial in range(trials):
+            name = rng.choice(["style", "ux", "color"])
+            config = core.CSV_CONFIG[name]
+            search_cols, output_cols = config["search_cols"], config["output_cols"]
+            rows = core._load_csv(core.DATA_DIR / config["file"])
+            rows = [dict(rng.choice(rows)) for _ in range(len(rows) * rng.choice([1, 3, 10]))]
+            for row in rows[::7]:  # quoted line breaks a chunk cut must not split
+                row[search_cols[0]] += '\nmulti "line" dark\r\nmode'
+            path = tmp / f"shards_{trial}.csv"
+            with open(path, 'w', encoding='utf-8', newline='') as f:
+                writer = csv.DictWriter(f, fieldnames=list(rows[0]), lineterminator="\r\n" if trial % 2 else "\n")
+                writer.writeheader()
+                writer.writerows(rows)
+
+            parallel_build._BLOCK = rng.choice([64, 1000, 1 << 20])  # cut targets across block edges
+            stat = path.stat()
+            signature = (stat.st_mtime_ns, stat.st_size)
+            workers = rng.choice([2, 3, 5])
+            entry = parallel_build.build_sharded(path, search_cols, output_cols, signature, workers)
+            fresh = core._stream_fit(path, search_cols, output_cols, signature)
+            if entry is None:
+                failures.append(f"{name} trial {trial}: no sharded build with {workers} workers")
+                continue
+            if entry.bm25.to_state() != fresh.bm25.to_state():
+                failures.append(f"{name} trial {trial}: BM25 state with {workers} workers")
+            all_ids = range(len(fresh.rows))
+            if len(entry.rows) != len(fresh.rows) or entry.rows.fetch(all_ids) != fresh.rows.fetch(all_ids):
+                failures.append(f"{name} trial {trial}: rows with {workers} workers")
+            if list(entry.rows.offsets) != list(fresh.rows.offsets) or entry.digest != fresh.digest:
+                failures.append(f"{name} trial {trial}: offsets or CRC-32 with {workers} workers")
+    finally:
+        parallel_build._BLOCK = block
+    return failures
+
+
+# check: (function, default trials)
+CHECKS = {
+    "updates": (check_updates, 300),
+    "appends": (check_appends, 60),
+    "stream": (check_stream, 400),
+    "shards": (check_shards, 12),
+}
+
+
+def check(names, trials, seed):
+    """Run the named checks; returns (report rows, failure messages)"""
+    report = []
+    failures = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for name in names:
+            function, default = CHECKS[name]
+            n = default if trials is None else trials
+            found = function(random.Random(seed), n, Path(tmp))
+            report.append({"check": name, "trials": n, "mismatches": len(found)})
+            failures += [f"{name}: {message}" for message in found[:MAX_FAILURES]]
+            if len(found) > MAX_FAILURES:
+                failures.append(f"{name}: ... {len(found) - MAX_FAILURES} more")
+    return report, failures
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="UI Pro Max index equivalence check")
+    parser.add_argument("--check", "-c", action="append", choices=list(CHECKS),
+                        help="Check to run (repeatable; default: all)")
+    parser.add_argument("--trials", "-n", type=int, help="Trials per check (default: each check's own)")
+    parser.add_argument("--seed", type=int, default=1, help="Random seed (default: 1)")
+    parser.add_argument("--json", action="store_true", help="Output as JSON")
+    args = parser.parse_args()
+
+    report, failures = check(args.check or list(CHECKS), args.trials, args.seed)
+    if args.json:
+        print(json.dumps({"report": report, "failures": failures}, indent=2))
+    else:
+        for r in report:
+            print(f"{r['check']:<10} {r['trials']:>5} trials  {r['mismatches']} mismatches")
+        for failure in failures:
+            print(f"FAIL {failure}")
+    sys.exit(1 if failures else 0)
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+UI/UX Pro Max Startup Check - import-time budget for the search.py CLI
+
+Usage: python check_startup.py [--runs 5] [--json]
+
+Runs each CLI mode under `python -X importtime` and sums the import time of
+every module the CLI loads beyond a bare interpreter. Absolute times swing
+with machine load, so each run is paired with a reference interpreter that
+imports what any argparse CLI needs (REFERENCE), and the best mode time is
+compared against the best reference time of the same runs: the budget is a
+ratio, with real headroom. The strict part is the module check: a mode
+fails if it imports a module it should not need (e.g. design_system for a
+plain domain search). Exits 1 on any violation, so it can gate CI.
+"""
+
+import argparse
+import compileall
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+# ============ CONFIGURATION ============
+SEARCH_PY = Path(__file__).parent / "search.py"
+
+# Reference start-up every mode is measured against: argparse (with re,
+# gettext and shutil) and pathlib
+REFERENCE = ["-c", "import argparse, pathlib"]
+
+# mode: (CLI arguments, import budget as a multiple of REFERENCE, modules that
+# must not be imported). Modes measure 1.6-2.2x the reference on a 1-vCPU box
+# (2.0 for search, 2.2 for design_system at worst over repeated checks);
+# budgets leave ~35% headroom over those worst ratios.
+BUDGETS = {
+    "help": (["--help"], 2.7, ["design_system", "index_store", "json", "csv"]),
+    "search": (["dark mode dashboard", "--domain", "style"], 2.7, ["design_system", "server", "json"]),
+    "search_json": (["dark mode dashboard", "--domain", "style", "--json"], 2.8, ["design_system", "server"]),
+    "stack": (["responsive layout", "--stack", "html-tailwind"], 2.7, ["design_system", "server", "json"]),
+    "design_system": (["saas analytics dashboard", "--design-system"], 3.0, ["server"])
+}
+
+
+def _imports(args):
+    """Return ({top-level module: cumulative_us}, every module imported) for one `python -X importtime` run"""
+    proc = subprocess.run([sys.executable, "-X", "importtime"] + args,
+                          capture_output=True, text=True, cwd=SEARCH_PY.parent)
+    if proc.returncode != 0:
+        raise RuntimeError(f"{' '.join(args)} exited with {proc.returncode}: {proc.stderr[-500:]}")
+    modules = {}
+    names = set()
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if not cumulative.strip().isdigit():
+            continue  # header
+        names.add(name.strip())
+        if not name.startswith("  "):  # nested imports are counted in their parent
+            modules[name.strip()] = int(cumulative)
+    return modules, names
+
+
+def measure(mode, runs):
+    """Best-of-runs import time (ms) for a mode and for REFERENCE in the same runs, plus every module the mode imported"""
+    _, baseline = _imports(["-c", "pass"])
+    args, _, _ = BUDGETS[mode]
+    best = reference = None
+    seen = set()
+    for _ in range(runs):
+        modules, _names = _imports(REFERENCE)
+        total = sum(us for name, us in modules.items() if name not in baseline) / 1000
+        reference = total if reference is None else min(reference, total)
+        modules, names = _imports([str(SEARCH_PY)] + args)
+        seen.update(names)
+        total = sum(us for name, us in modules.items() if name not in baseline) / 1000
+        best = total if best is None else min(best, total)
+    return round(best, 2), round(reference, 2), seen
+
+
+def check(runs):
+    """Measure every mode; returns (report rows, failure messages)"""
+    # Measure warm starts: refresh bytecode caches (even under PYTHONDONTWRITEBYTECODE)
+    compileall.compile_dir(SEARCH_PY.parent, quiet=1)
+    report = []
+    failures = []
+    for mode, (_, budget, forbidden) in BUDGETS.items():
+        import_ms, reference_ms, seen = measure(mode, runs)
+        ratio = round(import_ms / reference_ms, 2) if reference_ms else 0.0
+        loaded = sorted(name for name in forbidden if name in seen)
+        report.append({"mode": mode, "import_ms": import_ms, "reference_ms": reference_ms, "ratio": ratio,
+                       "budget_ratio": budget, "forbidden_imports": loaded})
+        if ratio > budget:
+            failures.append(f"{mode}: imports took {import_ms} ms, {ratio}x the reference {reference_ms} ms (budget {budget}x)")
+        if loaded:
+            failures.append(f"{mode}: imported {', '.join(loaded)}")
+    return report, failures
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="UI Pro Max CLI startup budget check")
+    parser.add_argument("--runs", type=int, default=5, help="Runs per mode; the fastest is compared (default: 5)")
+    parser.add_argument("--json", action="store_true", help="Output as JSON")
+    args = parser.parse_args()
+
+    report, failures = check(args.runs)
+    if args.json:
+        print(json.dumps({"report": report, "failures": failures}, indent=2))
+    else:
+        for r in report:
+            print(f"{r['mode']:<14} {r['import_ms']:>7.2f} ms  {r['ratio']:>5.2f}x reference {r['reference_ms']:.2f} ms"
+                  f"  (budget {r['budget_ratio']}x)")
+        for failure in failures:
+            print(f"FAIL {failure}")
+    sys.exit(1 if failures else 0)
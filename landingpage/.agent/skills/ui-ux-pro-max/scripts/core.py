@@ -4,15 +4,39 @@
 UI/UX Pro Max Core - BM25 search engine for UI/UX style guides
 """
 
-import csv
+import heapq
+import itertools
+import os
 import re
+import sys
+import threading
+from array import array
+from bisect import bisect_left, bisect_right
 from pathlib import Path
 from math import log
-from collections import defaultdict
+from collections import OrderedDict, namedtuple
+from functools import lru_cache
+
+from matcher import ROUTER
 
 # ============ CONFIGURATION ============
 DATA_DIR = Path(__file__).parent.parent / "data"
 MAX_RESULTS = 3
+INDEX_CACHE_SIZE = 32  # Fitted CSV indexes kept resident (all domains + stacks fit)
+RESULT_CACHE_SIZE = 1024  # Ranked results kept for repeated search()/search_stack() calls
+TOKEN_CACHE_SIZE = 4096  # Tokenized query strings kept by tokenize_query()
+ROW_CACHE_SIZE = 256  # Decoded output rows kept per on-demand row store (see _RowStore)
+
+# BM25 scoring backend: "auto", "python" or "numpy" (NumPy is optional).
+# "auto" only switches to NumPy for corpora large enough for it to pay off.
+BM25_BACKEND = os.environ.get("UIPRO_BM25_BACKEND", "auto")
+NUMPY_MIN_DOCS = 10000  # Crossover measured with benchmark.py
+# Worker processes for fitting large CSVs (see parallel_build.py)
+BUILD_WORKERS = int(os.environ.get("UIPRO_BUILD_WORKERS") or os.cpu_count() or 1)
+PARALLEL_MIN_BYTES = 4 << 20  # Smaller CSVs fit faster than worker processes start
+# Company records CSV: absolute, or relative to data/. Point UIPRO_COMPANY_CSV at a
+# CNPJ export, e.g. the sample empresa_ti_aracaju.csv at the repository root
+COMPANY_CSV = os.environ.get("UIPRO_COMPANY_CSV", "companies.csv")
 
 CSV_CONFIG = {
     "style": {
@@ -43,7 +67,8 @@ CSV_CONFIG = {
     "ux": {
         "file": "ux-guidelines.csv",
         "search_cols": ["Category", "Issue", "Description", "Platform"],
-        "output_cols": ["Category", "Issue", "Platform", "Description", "Do", "Don't", "Code Example Good", "Code Example Bad", "Severity"]
+        "output_cols": ["Category", "Issue", "Platform", "Description", "Do", "Don't", "Code Example Good", "Code Example Bad", "Severity"],
+        "facet_cols": ["Category", "Platform", "Severity"]
     },
     "typography": {
         "file": "typography.csv",
@@ -58,12 +83,24 @@ CSV_CONFIG = {
     "react": {
         "file": "react-performance.csv",
         "search_cols": ["Category", "Issue", "Keywords", "Description"],
-        "output_cols": ["Category", "Issue", "Platform", "Description", "Do", "Don't", "Code Example Good", "Code Example Bad", "Severity"]
+        "output_cols": ["Category", "Issue", "Platform", "Description", "Do", "Don't", "Code Example Good", "Code Example Bad", "Severity"],
+        "facet_cols": ["Category", "Platform", "Severity"]
     },
     "web": {
         "file": "web-interface.csv",
         "search_cols": ["Category", "Issue", "Keywords", "Description"],
-        "output_cols": ["Category", "Issue", "Platform", "Description", "Do", "Don't", "Code Example Good", "Code Example Bad", "Severity"]
+        "output_cols": ["Category", "Issue", "Platform", "Description", "Do", "Don't", "Code Example Good", "Code Example Bad", "Severity"],
+        "facet_cols": ["Category", "Platform", "Severity"]
+    },
+    # Company records in the CNPJ dump format (see COMPANY_CSV)
+    "company": {
+        "file": COMPANY_CSV,
+        "search_cols": ["nome_fantasia", "logradouro", "bairro"],
+        "output_cols": ["cnpj_base", "ordem", "dv", "nome_fantasia", "situacao_cadastral", "data_inicio_atividade", "cnae_principal", "cnae_secundaria", "tipo_logradouro", "logradouro", "numero", "complemento", "bairro", "cep", "uf", "municipio", "ddd1", "telefone1", "correio_eletronico"],
+        "facet_cols": ["cnae_principal", "cnae_secundaria", "uf", "municipio", "situacao_cadastral"],
+        "multi_value_cols": {"cnae_secundaria": ","},
+        "null_value": "NULL",
+        "search_all": False  # not part of the cross-domain UI/UX index
     }
 }
 
@@ -86,164 +123,1687 @@ STACK_CONFIG = {
 # Common columns for all stacks
 _STACK_COLS = {
     "search_cols": ["Category", "Guideline", "Description", "Do", "Don't"],
-    "output_cols": ["Category", "Guideline", "Description", "Do", "Don't", "Code Good", "Code Bad", "Severity", "Docs URL"]
+    "output_cols": ["Category", "Guideline", "Description", "Do", "Don't", "Code Good", "Code Bad", "Severity", "Docs URL"],
+    "facet_cols": ["Category", "Severity"]
 }
 
 AVAILABLE_STACKS = list(STACK_CONFIG.keys())
 
+# Keywords that route a query to a domain (detect_domain): each occurring
+# keyword counts one hit, and the domain with most hits wins
+DOMAIN_KEYWORDS = {
+    "color": ["color", "palette", "hex", "#", "rgb"],
+    "chart": ["chart", "graph", "visualization", "trend", "bar", "pie", "scatter", "heatmap", "funnel"],
+    "landing": ["landing", "page", "cta", "conversion", "hero", "testimonial", "pricing", "section"],
+    "product": ["saas", "ecommerce", "e-commerce", "fintech", "healthcare", "gaming", "portfolio", "crypto", "dashboard"],
+    "style": ["style", "design", "ui", "minimalism", "glassmorphism", "neumorphism", "brutalism", "dark mode", "flat", "aurora", "prompt", "css", "implementation", "variable", "checklist", "tailwind"],
+    "ux": ["ux", "usability", "accessibility", "wcag", "touch", "scroll", "animation", "keyboard", "navigation", "mobile"],
+    "typography": ["font", "typography", "heading", "serif", "sans"],
+    "icons": ["icon", "icons", "lucide", "heroicons", "symbol", "glyph", "pictogram", "svg icon"],
+    "react": ["react", "next.js", "nextjs", "suspense", "memo", "usecallback", "useeffect", "rerender", "bundle", "waterfall", "barrel", "dynamic import", "rsc", "server component"],
+    "web": ["aria", "focus", "outline", "semantic", "virtualize", "autocomplete", "form", "input type", "preconnect"]
+}
+
+ROUTE_MIN_CONFIDENCE = 0.6  # route_query: below this share of keyword hits, routing is ambiguous
+ROUTER.add_table("domain", DOMAIN_KEYWORDS.items())
+
+
+# Per-source indexing options beyond search/output columns: columns indexed for
+# filters (see _FacetIndex), their value separators, and the cell text meaning "no value"
+SourceOptions = namedtuple("SourceOptions", "facet_cols separators null_value")
+
+
+def source_options(config):
+    """SourceOptions for a CSV_CONFIG / _STACK_COLS entry, or None if it has none"""
+    if not (config.get("facet_cols") or config.get("null_value")):
+        return None
+    return SourceOptions(tuple(config.get("facet_cols", ())),
+                         tuple(sorted(config.get("multi_value_cols", {}).items())),
+                         config.get("null_value"))
+
+
+def source_file(filepath):
+    """Name results report a source CSV under: its path below data/, or just its file name"""
+    try:
+        return filepath.relative_to(DATA_DIR).as_posix()
+    except ValueError:
+        return filepath.name
+
+
+def iter_sources():
+    """Yield (name, filepath, search_cols, output_cols, options) for every domain and stack.
+
+    Stacks are named "stack:<stack>" so they cannot clash with domain names.
+    """
+    for domain, config in CSV_CONFIG.items():
+        yield domain, DATA_DIR / config["file"], config["search_cols"], config["output_cols"], source_options(config)
+    for stack, config in STACK_CONFIG.items():
+        yield (f"stack:{stack}", DATA_DIR / config["file"], _STACK_COLS["search_cols"], _STACK_COLS["output_cols"],
+               source_options(_STACK_COLS))
+
+
+# ============ TOKENIZER ============
+_PUNCT_RE = re.compile(r'[^\w\s]')
+# ASCII fast path: replace exactly the characters _PUNCT_RE matches, via bytes.translate
+_ASCII_PUNCT = bytes(32 if c < 128 and _PUNCT_RE.match(chr(c)) else c for c in range(256))
+
+
+def tokenize(text):
+    """Lowercase, split, remove punctuation, filter short words.
+
+    The one analyzer behind both indexing (BM25.fit) and querying.
+    """
+    text = str(text).lower()
+    if text.isascii():
+        text = text.encode('ascii').translate(_ASCII_PUNCT).decode('ascii')
+    else:
+        text = _PUNCT_RE.sub(' ', text)
+    return [w for w in text.split() if len(w) > 2]
+
+
+@lru_cache(maxsize=TOKEN_CACHE_SIZE)
+def tokenize_query(query):
+    """tokenize() for query strings: memoized, with interned tokens, as a tuple"""
+    return tuple(sys.intern(w) for w in tokenize(query))
+
+
+def count_terms(documents):
+    """Tokenize documents and count their terms, in the postings layout BM25 uses.
+
+    Returns (doc_lengths, terms, offsets, doc_ids, tfs): terms in order of
+    first occurrence, and the postings of terms[i] (ascending doc ids) are
+    doc_ids[offsets[i]:offsets[i + 1]] with frequencies in tfs. This is the
+    per-shard half of BM25.fit_counts().
+    """
+    corpus = [tokenize(doc) for doc in documents]
+    doc_lengths = array('I', map(len, corpus))
+
+    term_ids = {}
+    docs_by_term = []
+    tfs_by_term = []
+    for idx, doc in enumerate(corpus):
+        term_freqs = {}
+        for word in doc:
+            term_freqs[word] = term_freqs.get(word, 0) + 1
+        for word, tf in term_freqs.items():
+            tid = term_ids.get(word)
+            if tid is None:
+                # Interned keys let interned query tokens match by identity
+                tid = term_ids[sys.intern(word)] = len(docs_by_term)
+                docs_by_term.append([])
+                tfs_by_term.append([])
+            docs_by_term[tid].append(idx)
+            tfs_by_term[tid].append(tf)
+
+    offsets = array('I', [0])
+    for docs in docs_by_term:
+        offsets.append(offsets[-1] + len(docs))
+    doc_ids = array('I', [idx for docs in docs_by_term for idx in docs])
+    tfs = [tf for term_tfs in tfs_by_term for tf in term_tfs]
+    return doc_lengths, list(term_ids), offsets, doc_ids, tfs
+
 
 # ============ BM25 IMPLEMENTATION ============
 class BM25:
-    """BM25 ranking algorithm for text search"""
+    """BM25 ranking algorithm for text search.
+
+    The fitted index is kept in flat arrays: term_ids maps each (interned)
+    term to an integer id, per-term statistics are arrays indexed by that id,
+    and the postings of term id t are doc_ids[offsets[t]:offsets[t + 1]]
+    (ascending) with matching term frequencies in tfs.
+
+    add_documents / update_document / remove_document edit a fitted index in
+    place. Document ids are positions and never shift: a removed document
+    leaves a tombstone. Document frequencies are maintained as documents
+    change; postings, IDF, avgdl and length norms are brought up to date
+    lazily by refresh() on the next query, after which scores equal those of
+    a fresh fit over the live documents (in id order).
+    """
+
+    __slots__ = ("k1", "b", "N", "avgdl", "term_ids", "doc_freqs", "idf", "offsets", "doc_ids", "tfs",
+                 "doc_lengths", "doc_norms", "_max_contrib", "_total_length", "_deleted", "_pending",
+                 "_dropped", "_forward", "_stale")
+    _ARRAYS = ("doc_freqs", "idf", "offsets", "doc_ids", "tfs", "doc_lengths", "doc_norms")
 
     def __init__(self, k1=1.5, b=0.75):
         self.k1 = k1
         self.b = b
-        self.corpus = []
-        self.doc_lengths = []
-        self.avgdl = 0
-        self.idf = {}
-        self.doc_freqs = defaultdict(int)
         self.N = 0
+        self.avgdl = 0
+        self.term_ids = {}
+        self.doc_freqs = array('I')
+        self.idf = array('d')
+        self.offsets = array('I', [0])
+        self.doc_ids = array('I')
+        self.tfs = array('H')
+        self.doc_lengths = array('I')
+        self.doc_norms = array('d')
+        self._max_contrib = {}
+        self._reset_updates()
+
+    def _reset_updates(self):
+        """Forget incremental-update bookkeeping (the index is fully up to date)"""
+        self._total_length = sum(self.doc_lengths)
+        self._deleted = set()
+        self._pending = {}  # term id -> [(doc_id, tf)] added since the last refresh
+        self._dropped = {}  # term id -> {doc_id} removed from its postings since the last refresh
+        self._forward = None  # doc id -> term ids, built on first update/remove
+        self._stale = False
 
     def tokenize(self, text):
         """Lowercase, split, remove punctuation, filter short words"""
-        text = re.sub(r'[^\w\s]', ' ', str(text).lower())
-        return [w for w in text.split() if len(w) > 2]
+        return tokenize(text)
 
     def fit(self, documents):
-        """Build BM25 index from documents"""
-        self.corpus = [self.tokenize(doc) for doc in documents]
-        self.N = len(self.corpus)
-        if self.N == 0:
-            return
-        self.doc_lengths = [len(doc) for doc in self.corpus]
-        self.avgdl = sum(self.doc_lengths) / self.N
-
-        for doc in self.corpus:
-            seen = set()
-            for word in doc:
-                if word not in seen:
-                    self.doc_freqs[word] += 1
-                    seen.add(word)
-
-        for word, freq in self.doc_freqs.items():
-            self.idf[word] = log((self.N - freq + 0.5) / (freq + 0.5) + 1)
+        """Build the inverted index (term id -> doc ids and tfs) from documents"""
+        self.fit_counts([count_terms(documents)])
+
+    def fit_counts(self, shards):
+        """Build the index from count_terms() results of consecutive document shards.
+
+        Equivalent to fit() over the concatenated documents, so shards can be
+        tokenized and counted in parallel (see parallel_build.py): terms get
+        ids in order of first occurrence and postings stay in doc id order.
+        """
+        if len(shards) == 1:
+            self.doc_lengths, terms, self.offsets, self.doc_ids, tfs = shards[0]
+            term_ids = {sys.intern(term): tid for tid, term in enumerate(terms)}
+        else:
+            term_ids, tfs = self._merge_counts(shards)
+
+        # An empty corpus still replaces every fitted field: nothing may
+        # survive from a previous fit
+        self.N = len(self.doc_lengths)
+        self.avgdl = sum(self.doc_lengths) / self.N if self.N else 0
+
+        # Length normalisation is the only per-document part of the BM25
+        # denominator, so it is computed once here instead of per query
+        if self.avgdl:
+            self.doc_norms = array('d', [self.k1 * (1 - self.b + self.b * doc_len / self.avgdl) for doc_len in self.doc_lengths])
+        else:
+            self.doc_norms = array('d', [self.k1 * (1 - self.b)]) * self.N
+
+        self.term_ids = term_ids
+        offsets = self.offsets
+        self.doc_freqs = array('I', [offsets[tid + 1] - offsets[tid] for tid in range(len(offsets) - 1)])
+        self.tfs = array('H' if max(tfs, default=0) < 1 << 16 else 'I', tfs)
+        self.idf = array('d', [log((self.N - freq + 0.5) / (freq + 0.5) + 1) for freq in self.doc_freqs])
+        self._max_contrib = {}
+        self._reset_updates()
+
+    def _merge_counts(self, shards):
+        """Concatenate shard counts into doc_lengths/offsets/doc_ids; returns (term_ids, tfs)"""
+        term_ids = {}
+        slices = []  # term id -> [(shard, start, end)] into that shard's postings
+        for shard, (_, terms, offsets, _, _) in enumerate(shards):
+            for local, term in enumerate(terms):
+                tid = term_ids.get(term)
+                if tid is None:
+                    tid = term_ids[sys.intern(term)] = len(slices)
+                    slices.append([])
+                slices[tid].append((shard, offsets[local], offsets[local + 1]))
+
+        bases = [0]
+        self.doc_lengths = array('I')
+        for lengths, _, _, _, _ in shards:
+            self.doc_lengths.extend(lengths)
+            bases.append(len(self.doc_lengths))
+
+        self.offsets = array('I', [0])
+        self.doc_ids = array('I')
+        tfs = array('I')
+        for term_slices in slices:
+            for shard, start, end in term_slices:
+                base = bases[shard]
+                doc_ids = shards[shard][3][start:end]
+                self.doc_ids.extend([idx + base for idx in doc_ids] if base else doc_ids)
+                tfs.extend(shards[shard][4][start:end])
+            self.offsets.append(len(self.doc_ids))
+        return term_ids, tfs
+
+    def add_documents(self, documents):
+        """Append documents without refitting; returns their doc ids"""
+        first = len(self.doc_lengths)
+        for doc in documents:
+            self.doc_lengths.append(0)
+            if self._forward is not None:
+                self._forward.append(array('I'))
+            self._place(len(self.doc_lengths) - 1, tokenize(doc))
+        return range(first, len(self.doc_lengths))
+
+    def update_document(self, idx, document):
+        """Replace the text of live document idx (its id is kept)"""
+        self._check_live(idx)
+        self._drop(idx)
+        self._place(idx, tokenize(document))
+
+    def remove_document(self, idx):
+        """Remove live document idx, leaving a tombstone so other ids do not shift"""
+        self._check_live(idx)
+        self._drop(idx)
+        self._deleted.add(idx)
+
+    def _check_live(self, idx):
+        if not 0 <= idx < len(self.doc_lengths) or idx in self._deleted:
+            raise IndexError(f"No document {idx}")
+
+    def _forward_index(self):
+        """doc id -> array of its term ids, built from the postings on first use"""
+        if self._forward is None:
+            forward = [[] for _ in self.doc_lengths]
+            for tid in range(len(self.doc_freqs)):
+                dropped = self._dropped.get(tid, ())
+                for idx in self.postings(tid)[0]:
+                    if idx not in dropped:
+                        forward[idx].append(tid)
+            for tid, pending in self._pending.items():
+                for idx, _ in pending:
+                    forward[idx].append(tid)
+            self._forward = [array('I', tids) for tids in forward]
+        return self._forward
+
+    def _place(self, idx, tokens):
+        """Index tokens as the content of (empty) document slot idx"""
+        term_freqs = {}
+        for word in tokens:
+            term_freqs[word] = term_freqs.get(word, 0) + 1
+        tids = array('I')
+        for word, tf in term_freqs.items():
+            tid = self.term_ids.get(word)
+            if tid is None:
+                tid = self.term_ids[sys.intern(word)] = len(self.doc_freqs)
+                self.doc_freqs.append(0)
+                self.idf.append(0.0)
+                self.offsets.append(self.offsets[-1])
+            self.doc_freqs[tid] += 1
+            self._pending.setdefault(tid, []).append((idx, tf))
+            tids.append(tid)
+        if self._forward is not None:
+            self._forward[idx] = tids
+        self.doc_lengths[idx] = len(tokens)
+        self._total_length += len(tokens)
+        self.N += 1
+        self._stale = True
+
+    def _drop(self, idx):
+        """Take document idx out of the postings and corpus statistics"""
+        forward = self._forward_index()
+        for tid in forward[idx]:
+            self.doc_freqs[tid] -= 1
+            pending = self._pending.get(tid)
+            if pending and any(doc == idx for doc, _ in pending):
+                self._pending[tid] = [(doc, tf) for doc, tf in pending if doc != idx]
+            else:
+                self._dropped.setdefault(tid, set()).add(idx)
+        forward[idx] = array('I')
+        self._total_length -= self.doc_lengths[idx]
+        self.doc_lengths[idx] = 0
+        self.N -= 1
+        self._stale = True
+
+    def refresh(self):
+        """Apply pending updates to postings, IDF, avgdl and norms.
+
+        Query methods call this themselves; returns True if anything changed.
+        """
+        if not self._stale:
+            return False
+        if self._pending or self._dropped:
+            tfs = self.tfs
+            if tfs.typecode == 'H' and any(tf >= 1 << 16 for pending in self._pending.values() for _, tf in pending):
+                tfs = array('I', tfs)
+            offsets = array('I', [0])
+            doc_ids = array('I')
+            new_tfs = array(tfs.typecode)
+            for tid in range(len(self.doc_freqs)):
+                start, end = self.offsets[tid], self.offsets[tid + 1]
+                pending = self._pending.get(tid)
+                dropped = self._dropped.get(tid)
+                if pending is None and dropped is None:
+                    doc_ids.extend(self.doc_ids[start:end])
+                    new_tfs.extend(tfs[start:end])
+                elif dropped is None and pending and (start == end or min(pending)[0] > self.doc_ids[end - 1]):
+                    # Only appended documents: they all go after the existing postings
+                    pending.sort()
+                    doc_ids.extend(self.doc_ids[start:end])
+                    new_tfs.extend(tfs[start:end])
+                    doc_ids.extend(array('I', [idx for idx, _ in pending]))
+                    new_tfs.extend(array(tfs.typecode, [tf for _, tf in pending]))
+                else:
+                    pairs = [(idx, tf) for idx, tf in zip(self.doc_ids[start:end], tfs[start:end])
+                             if dropped is None or idx not in dropped]
+                    if pending:
+                        pairs.extend(pending)
+                        pairs.sort()
+                    doc_ids.extend(array('I', [idx for idx, _ in pairs]))
+                    new_tfs.extend(array(tfs.typecode, [tf for _, tf in pairs]))
+                offsets.append(len(doc_ids))
+            self.offsets, self.doc_ids, self.tfs = offsets, doc_ids, new_tfs
+            self._pending = {}
+            self._dropped = {}
+
+        # Same expressions as fit(), over the live documents
+        self.avgdl = self._total_length / self.N if self.N else 0
+        if self.avgdl:
+            self.doc_norms = array('d', [self.k1 * (1 - self.b + self.b * doc_len / self.avgdl) for doc_len in self.doc_lengths])
+        else:
+            self.doc_norms = array('d', [self.k1 * (1 - self.b)]) * len(self.doc_lengths)
+        self.idf = array('d', [log((self.N - freq + 0.5) / (freq + 0.5) + 1) for freq in self.doc_freqs])
+        self._max_contrib = {}
+        self._stale = False
+        return True
+
+    def copy(self):
+        """Independent copy of the index (arrays copied, term strings shared)"""
+        self.refresh()
+        clone = type(self)(self.k1, self.b)
+        clone.N = self.N
+        clone.avgdl = self.avgdl
+        clone.term_ids = dict(self.term_ids)
+        for name in self._ARRAYS:
+            setattr(clone, name, getattr(self, name)[:])
+        clone._max_contrib = dict(self._max_contrib)
+        clone._reset_updates()
+        clone._deleted = set(self._deleted)
+        return clone
+
+    def postings(self, tid):
+        """(doc ids, term frequencies) of term id tid, as array slices"""
+        start, end = self.offsets[tid], self.offsets[tid + 1]
+        return self.doc_ids[start:end], self.tfs[start:end]
+
+    def nbytes(self):
+        """Approximate memory held by the fitted index (term strings included)"""
+        self.refresh()
+        return (sys.getsizeof(self.term_ids) + sum(sys.getsizeof(term) for term in self.term_ids)
+                + sum(sys.getsizeof(getattr(self, name)) for name in self._ARRAYS))
+
+    def _accumulate(self, query_tokens, ranges=None):
+        """Sum BM25 contributions over the postings of the query tokens only.
+
+        Returns {doc_id: score} for documents containing at least one token.
+        Tokens are visited in query order so every document's score is summed
+        in exactly the same order as a full per-document scan. ranges
+        optionally limits scoring to doc ids in sorted, disjoint [lo, hi)
+        ranges: only those stretches of each posting list are read.
+        """
+        self.refresh()
+        scores = {}
+        k1_plus_1 = self.k1 + 1
+        doc_norms = self.doc_norms
+        for token in query_tokens:
+            tid = self.term_ids.get(token)
+            if tid is None:
+                continue
+            idf = self.idf[tid]
+            start, end = self.offsets[tid], self.offsets[tid + 1]
+            if ranges is None:
+                spans = ((start, end),)
+            else:
+                spans = [(bisect_left(self.doc_ids, lo, start, end), bisect_left(self.doc_ids, hi, start, end))
+                         for lo, hi in ranges]
+            for first, last in spans:
+                for idx, tf in zip(self.doc_ids[first:last], self.tfs[first:last]):
+                    scores[idx] = scores.get(idx, 0) + idf * (tf * k1_plus_1) / (tf + doc_norms[idx])
+        return scores
 
     def score(self, query):
         """Score all documents against query"""
-        query_tokens = self.tokenize(query)
-        scores = []
+        scores = self._accumulate(tokenize_query(query))
+
+        # Matched documents always score > 0, so they rank ahead of the rest;
+        # ties keep document order, as the previous stable sort did
+        ranked = sorted(scores.items(), key=lambda x: (-x[1], x[0]))
+        ranked.extend((idx, 0) for idx in range(len(self.doc_lengths)) if idx not in scores and idx not in self._deleted)
+        return ranked
+
+    def _term_upper_bound(self, tid):
+        """Largest single-occurrence contribution term id tid can make to any document"""
+        bound = self._max_contrib.get(tid)
+        if bound is None:
+            idf = self.idf[tid]
+            k1_plus_1 = self.k1 + 1
+            doc_norms = self.doc_norms
+            bound = max(idf * (tf * k1_plus_1) / (tf + doc_norms[idx]) for idx, tf in zip(*self.postings(tid)))
+            self._max_contrib[tid] = bound
+        return bound
+
+    def _top_k_within(self, query_tids, k, docs):
+        """top_k() restricted to the sorted doc ids in docs.
+
+        Few candidates are looked up in each query term's postings by
+        bisection; otherwise the postings are walked and documents outside
+        docs skipped. Either way scores are summed in query order.
+        """
+        tids = [tid for tid in dict.fromkeys(query_tids) if tid is not None]
+        if not docs or not tids:
+            return []
+        k1_plus_1 = self.k1 + 1
+        doc_norms = self.doc_norms
+        idf = self.idf
+        lists = {tid: self.postings(tid) for tid in tids}
+        scores = {}
+        if len(docs) * len(tids) <= sum(len(ids) for ids, _ in lists.values()):
+            for candidate in docs:
+                tfs = {}
+                for tid, (ids, term_tfs) in lists.items():
+                    pos = bisect_left(ids, candidate)
+                    if pos < len(ids) and ids[pos] == candidate:
+                        tfs[tid] = term_tfs[pos]
+                if tfs:
+                    score = 0
+                    for tid in query_tids:
+                        tf = tfs.get(tid)
+                        if tf is not None:
+                            score = score + idf[tid] * (tf * k1_plus_1) / (tf + doc_norms[candidate])
+                    scores[candidate] = score
+        else:
+            allowed = set(docs)
+            for tid in query_tids:
+                if tid is None:
+                    continue
+                for idx, tf in zip(*lists[tid]):
+                    if idx in allowed:
+                        scores[idx] = scores.get(idx, 0) + idf[tid] * (tf * k1_plus_1) / (tf + doc_norms[idx])
+        return heapq.nsmallest(k, scores.items(), key=lambda x: (-x[1], x[0]))
+
+    def top_k(self, query, k, docs=None):
+        """Return the k best (doc_id, score) pairs with score > 0, best first.
+
+        Same result as the positive-score prefix of score()[:k], without
+        ranking every document: postings are walked document-at-a-time with
+        MaxScore pruning, and a bounded heap keeps the current top k. Once
+        the heap is full, query terms whose combined upper bounds cannot beat
+        the k-th score stop generating candidates, and candidates whose upper
+        bound cannot beat it are skipped before being fully scored.
+
+        docs optionally restricts the ranking to a sorted list of doc ids
+        (a facet filter's matches).
+        """
+        self.refresh()
+        query_tids = [self.term_ids.get(token) for token in tokenize_query(query)]
+        if k <= 0:
+            return []
+        if docs is not None:
+            return self._top_k_within(query_tids, k, docs)
+        counts = {}
+        for tid in query_tids:
+            if tid is not None and self.doc_freqs[tid]:
+                counts[tid] = counts.get(tid, 0) + 1
+        if not counts:
+            return []
+
+        # Terms ordered by upper bound; prefix[i] bounds any document that only
+        # appears in terms[:i + 1]
+        terms = sorted(counts, key=lambda t: counts[t] * self._term_upper_bound(t))
+        bounds = [counts[t] * self._term_upper_bound(t) for t in terms]
+        prefix = []
+        total = 0.0
+        for bound in bounds:
+            total += bound
+            prefix.append(total)
+        lists = [self.postings(t) for t in terms]
+        positions = [0] * len(terms)
+
+        k1_plus_1 = self.k1 + 1
+        doc_norms = self.doc_norms
+        idf = self.idf
+        heap = []  # (score, -doc_id): heap[0] is the current k-th best
+        threshold = None
+        first_essential = 0
 
-        for idx, doc in enumerate(self.corpus):
+        while True:
+            # Next candidate: smallest unvisited doc id across essential lists
+            candidate = None
+            for i in range(first_essential, len(lists)):
+                pos = positions[i]
+                if pos < len(lists[i][0]):
+                    doc = lists[i][0][pos]
+                    if candidate is None or doc < candidate:
+                        candidate = doc
+            if candidate is None:
+                break
+
+            tfs = {}
+            bound = prefix[first_essential - 1] if first_essential else 0.0
+            for i in range(first_essential, len(lists)):
+                pos = positions[i]
+                docs, term_tfs = lists[i]
+                if pos < len(docs) and docs[pos] == candidate:
+                    tf = term_tfs[pos]
+                    tfs[terms[i]] = tf
+                    bound += counts[terms[i]] * idf[terms[i]] * (tf * k1_plus_1) / (tf + doc_norms[candidate])
+                    positions[i] = pos + 1
+
+            if threshold is not None and bound * (1 + 1e-9) <= threshold:
+                continue
+
+            # Look the candidate up in the non-essential lists, then score it
+            # in query order so the sum matches score() bit for bit
+            for i in range(first_essential):
+                docs, term_tfs = lists[i]
+                pos = bisect_left(docs, candidate, positions[i])
+                positions[i] = pos
+                if pos < len(docs) and docs[pos] == candidate:
+                    tfs[terms[i]] = term_tfs[pos]
             score = 0
-            doc_len = self.doc_lengths[idx]
-            term_freqs = defaultdict(int)
-            for word in doc:
-                term_freqs[word] += 1
+            for tid in query_tids:
+                tf = tfs.get(tid)
+                if tf is not None:
+                    score = score + idf[tid] * (tf * k1_plus_1) / (tf + doc_norms[candidate])
+
+            entry = (score, -candidate)
+            if len(heap) < k:
+                heapq.heappush(heap, entry)
+            elif entry > heap[0]:
+                heapq.heapreplace(heap, entry)
+            else:
+                continue
+            if len(heap) == k:
+                threshold = heap[0][0]
+                # Ties lose to earlier documents, so a prefix that can at most
+                # equal the threshold no longer needs to produce candidates
+                while first_essential < len(terms) and prefix[first_essential] * (1 + 1e-9) <= threshold:
+                    first_essential += 1
+
+        return [(-neg_doc, score) for score, neg_doc in sorted(heap, reverse=True)]
+
+    def score_batch(self, queries):
+        """Score several queries; returns one score() ranking per query"""
+        return [self.score(query) for query in queries]
+
+    def top_k_batch(self, queries, k):
+        """top_k() for several queries in a single pass over their postings.
+
+        Each distinct query is tokenized once and each distinct term's
+        contributions are computed once for the whole batch; documents are
+        then summed per query in token order, so results equal top_k().
+        """
+        self.refresh()
+        token_lists = {}
+        for query in queries:
+            if query not in token_lists:
+                token_lists[query] = tokenize_query(query)
+
+        contributions = {}
+        k1_plus_1 = self.k1 + 1
+        doc_norms = self.doc_norms
+        for tokens in token_lists.values():
+            for token in tokens:
+                tid = self.term_ids.get(token)
+                if token not in contributions and tid is not None:
+                    idf = self.idf[tid]
+                    contributions[token] = [(idx, idf * (tf * k1_plus_1) / (tf + doc_norms[idx]))
+                                            for idx, tf in zip(*self.postings(tid))]
+
+        ranked = {}
+        for query, tokens in token_lists.items():
+            scores = {}
+            for token in tokens:
+                for idx, contribution in contributions.get(token, ()):
+                    scores[idx] = scores.get(idx, 0) + contribution
+            ranked[query] = heapq.nsmallest(k, scores.items(), key=lambda x: (-x[1], x[0])) if k > 0 else []
+        return [ranked[query] for query in queries]
+
+    def to_state(self):
+        """Export the fitted index as plain builtins (arrays as (typecode, bytes); see index_store)"""
+        self.refresh()
+        state = {"k1": self.k1, "b": self.b, "N": self.N, "avgdl": self.avgdl, "terms": list(self.term_ids),
+                 "deleted": sorted(self._deleted)}
+        for name in self._ARRAYS:
+            values = getattr(self, name)
+            state[name] = (values.typecode, values.tobytes())
+        return state
+
+    @classmethod
+    def from_state(cls, state):
+        """Rebuild a fitted index from to_state() output without refitting"""
+        bm25 = cls(state["k1"], state["b"])
+        bm25.N = state["N"]
+        bm25.avgdl = state["avgdl"]
+        bm25.term_ids = {sys.intern(term): tid for tid, term in enumerate(state["terms"])}
+        for name in cls._ARRAYS:
+            typecode, data = state[name]
+            values = array(typecode)
+            values.frombytes(data)
+            setattr(bm25, name, values)
+        bm25._reset_updates()
+        bm25._deleted = set(state.get("deleted", ()))
+        return bm25
+
+
+def bm25_class(n_docs):
+    """Pick the BM25 implementation for a corpus of n_docs per BM25_BACKEND.
+
+    Falls back to the pure-Python BM25 whenever NumPy is not installed.
+    """
+    if BM25_BACKEND == "python" or (BM25_BACKEND == "auto" and n_docs < NUMPY_MIN_DOCS):
+        return BM25
+    try:
+        from bm25_numpy import NumpyBM25
+    except ImportError:
+        return BM25
+    return NumpyBM25
+
+
+# ============ INDEX CACHE ============
+class _IndexEntry:
+    """Output rows and fitted BM25 index for one CSV file.
+
+    rows is a row store whose fetch(ids) returns the projected output rows
+    for a search's hits (_MemoryRows, _CsvRows or index_store's memory-mapped
+    _MappedRows).
+
+    digest is the CRC-32 of the file contents the entry was built from; it
+    lets the registry recognise a later version of the file as an append.
+
+    facets is the source's _FacetIndex, or None without facet columns.
+
+    serial is unique to this entry (never reused), so caches can tell which
+    entry a value was computed from without keeping the entry alive.
+    """
+
+    __slots__ = ("signature", "rows", "bm25", "digest", "facets", "serial")
+    _serials = itertools.count()
+
+    def __init__(self, signature, rows, bm25, digest=None, facets=None):
+        self.signature = signature
+        self.rows = rows
+        self.bm25 = bm25
+        self.digest = digest
+        self.facets = facets
+        self.serial = next(self._serials)
+
+
+class _IndexRegistry:
+    """Process-wide LRU cache of fitted CSV indexes.
+
+    Entries are keyed by file path and column selection, and are rebuilt when
+    the file's mtime or size no longer matches the cached signature. When the
+    file only gained rows at the end, the new rows are added to a copy of the
+    old index instead (see _append_index).
+    """
+
+    def __init__(self, maxsize=INDEX_CACHE_SIZE):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.appends = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, filepath, search_cols, output_cols, options=None):
+        """Return the cached entry for filepath, building it if stale or missing"""
+        key = (str(filepath), tuple(search_cols), tuple(output_cols), options)
+        stat = filepath.stat()
+        signature = (stat.st_mtime_ns, stat.st_size)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.signature == signature:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry
+            self.misses += 1
+
+        # Build outside the lock so other files stay searchable meanwhile
+        updated = (_append_index(entry, filepath, search_cols, output_cols, signature, options)
+                   if entry is not None else None)
+        entry = updated or _build_index(filepath, search_cols, output_cols, signature, options)
+
+        with self._lock:
+            if updated is not None:
+                self.appends += 1
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return entry
+
+    def info(self):
+        """Return hit/miss counters, current occupancy and BM25 / facet index memory"""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "appends": self.appends,
+                "evictions": self.evictions,
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "bm25_bytes": sum(entry.bm25.nbytes() for entry in self._entries.values()),
+                "facet_bytes": sum(entry.facets.nbytes() for entry in self._entries.values()
+                                   if entry.facets is not None)
+            }
+
+    def clear(self):
+        """Drop every cached index and reset the counters"""
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.evictions = self.appends = 0
+
+
+_INDEXES = _IndexRegistry()
+
+
+def index_cache_info():
+    """Hit/miss statistics for the process-wide CSV index cache"""
+    return _INDEXES.info()
+
+
+def clear_index_cache():
+    """Forget all cached CSV indexes (they are rebuilt on next search)"""
+    _INDEXES.clear()
+
+
+# ============ RESULT CACHE ============
+class _ResultCache:
+    """Process-wide LRU cache of ranked results.
+
+    Keys are (domain or "stack:<name>", sorted query tokens, max_results), so
+    queries differing only in case, punctuation or word order share an entry.
+    Values hold the ranked row ids together with the serial of the
+    _IndexEntry they were ranked against (not the entry itself, so cached
+    results never keep an evicted or superseded index in memory); once the
+    registry rebuilds that index (the CSV changed), the value no longer
+    matches and is recomputed.
+    """
+
+    def __init__(self, maxsize=RESULT_CACHE_SIZE):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.nbytes = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(name, query, max_results, filters=None):
+        """Normalized cache key for one search (filters as resolved by _resolve_filters)"""
+        key = (name, tuple(sorted(tokenize_query(query))), max_results)
+        if filters:
+            key += (tuple(sorted((col, tuple(sorted({_FacetIndex.normalize(value) for value in values})))
+                                 for col, values in filters.items())),)
+        return key
+
+    @staticmethod
+    def _footprint(key, ids):
+        """Approximate bytes held by one cached item"""
+        return (sys.getsizeof(key) + sys.getsizeof(key[1]) + sum(sys.getsizeof(t) for t in key[1])
+                + sys.getsizeof(ids))
+
+    def get(self, key, entry):
+        """Cached row ids for key if they were ranked against entry, else None"""
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached is not None and cached[0] == entry.serial:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return cached[1]
+            self.misses += 1
+            return None
+
+    def put(self, key, entry, ids):
+        """Store the ranked row ids for key, evicting the least recently used items"""
+        ids = tuple(ids)
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.nbytes -= old[2]
+            size = self._footprint(key, ids)
+            self._entries[key] = (entry.serial, ids, size)
+            self.nbytes += size
+            while len(self._entries) > self.maxsize:
+                _, evicted = self._entries.popitem(last=False)
+                self.nbytes -= evicted[2]
+                self.evictions += 1
+
+    def info(self):
+        """Return hit/miss counters, hit rate, occupancy and approximate memory use"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "bytes": self.nbytes
+            }
+
+    def clear(self):
+        """Drop every cached result and reset the counters"""
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.evictions = self.nbytes = 0
+
+
+_RESULTS = _ResultCache()
+
+
+def result_cache_info():
+    """Hit rate, evictions and memory footprint of the search result cache"""
+    return _RESULTS.info()
+
+
+def clear_result_cache():
+    """Forget all cached search results"""
+    _RESULTS.clear()
+
+
+# ============ GLOBAL INDEX ============
+class _GlobalIndex:
+    """One BM25 index over every domain and stack (see iter_sources).
+
+    Documents are laid out source by source, so a posting's doc id maps back
+    to its domain through starts, and each domain is one contiguous doc id
+    range. IDF and document lengths are corpus-wide, so scores are
+    comparable across domains.
+    """
+
+    __slots__ = ("signature", "names", "files", "starts", "rows", "bm25")
+
+    def __init__(self, signature, sources):
+        self.signature = signature
+        self.names = []
+        self.files = {}
+        self.starts = []
+        self.rows = []
+        documents = []
+        for name, filepath, search_cols, output_cols, _ in sources:
+            data = _load_csv(filepath)
+            self.names.append(name)
+            self.files[name] = source_file(filepath)
+            self.starts.append(len(documents))
+            documents.extend(" ".join(str(row.get(col, "")) for col in search_cols) for row in data)
+            self.rows.extend({col: row.get(col, "") for col in output_cols if col in row} for row in data)
+
+        self.bm25 = bm25_class(len(documents))()
+        self.bm25.fit(documents)
+        self.starts.append(len(documents))  # end of the last source
+
+    def domain_of(self, idx):
+        """Name of the domain/stack a global doc id belongs to"""
+        return self.names[bisect_right(self.starts, idx) - 1]
+
+    def ranges(self, domains):
+        """Sorted [lo, hi) doc id ranges of the named domains, adjacent ones merged"""
+        ranges = []
+        for pos, name in enumerate(self.names):
+            if name in domains:
+                lo, hi = self.starts[pos], self.starts[pos + 1]
+                if ranges and ranges[-1][1] == lo:
+                    lo = ranges.pop()[0]
+                ranges.append((lo, hi))
+        return ranges
+
 
-            for token in query_tokens:
-                if token in self.idf:
-                    tf = term_freqs[token]
-                    idf = self.idf[token]
-                    numerator = tf * (self.k1 + 1)
-                    denominator = tf + self.k1 * (1 - self.b + self.b * doc_len / self.avgdl)
-                    score += idf * numerator / denominator
+_global_index = None
+_global_lock = threading.Lock()
 
-            scores.append((idx, score))
 
-        return sorted(scores, key=lambda x: x[1], reverse=True)
+def _get_global_index():
+    """Return the cross-domain index, rebuilding it when any source CSV changed"""
+    global _global_index
+    # Record-style domains (search_all False) would swamp the guideline corpora
+    sources = [source for source in iter_sources()
+               if source[1].exists() and CSV_CONFIG.get(source[0], {}).get("search_all", True)]
+    signature = tuple((name, filepath.stat().st_mtime_ns, filepath.stat().st_size)
+                      for name, filepath, _, _, _ in sources)
+    with _global_lock:
+        if _global_index is None or _global_index.signature != signature:
+            _global_index = _GlobalIndex(signature, sources)
+        return _global_index
+
+
+# ============ FACET INDEX ============
+_NONZERO_RUN = re.compile(rb'[^\x00]+')
+_BYTE_BITS = [tuple(bit for bit in range(8) if byte >> bit & 1) for byte in range(256)]
+
+
+def _bitmap(doc_ids, n_docs):
+    """Int bitmap (bit i set for doc i) of sorted doc ids"""
+    buf = bytearray((n_docs + 7) // 8)
+    for idx in doc_ids:
+        buf[idx >> 3] |= 1 << (idx & 7)
+    return int.from_bytes(buf, 'little')
+
+
+def _bitmap_ids(bits):
+    """Sorted doc ids of the set bits of an int bitmap"""
+    data = bits.to_bytes((bits.bit_length() + 7) // 8, 'little')
+    ids = []
+    for run in _NONZERO_RUN.finditer(data):
+        for pos, byte in enumerate(run.group(), run.start()):
+            base = pos * 8
+            ids.extend([base + bit for bit in _BYTE_BITS[byte]])
+    return ids
+
+
+class _FacetIndex:
+    """Per-column value -> document set indexes, so filters run before BM25 scoring.
+
+    Values match case-insensitively (stripped and casefolded). Empty cells
+    and the source's null literal index nothing; multi-valued columns are
+    split on their separator. A value's documents are a sorted array of doc
+    ids while sparse, and an int bitmap (bit i = doc i) once compact() finds
+    it on at least 1/32 of the documents, where the bitmap is the smaller.
+    match() ORs the values given for a column and ANDs the columns as
+    bitmaps, then hands the surviving doc ids to BM25.top_k.
+    """
+
+    __slots__ = ("separators", "null", "n_docs", "values")
+
+    def __init__(self, options):
+        separators = dict(options.separators)
+        self.separators = {col: separators.get(col) for col in options.facet_cols}
+        self.null = options.null_value
+        self.n_docs = 0
+        self.values = {col: {} for col in options.facet_cols}
+
+    @staticmethod
+    def normalize(value):
+        """Lookup key of a cell or filter value"""
+        return str(value).strip().casefold()
+
+    def add(self, cells):
+        """Index the next document's facet cells (in facet column order; None if missing)"""
+        idx = self.n_docs
+        self.n_docs += 1
+        for (col, separator), cell in zip(self.separators.items(), cells):
+            if not cell or cell == self.null:
+                continue
+            values = self.values[col]
+            for part in cell.split(separator) if separator else (cell,):
+                key = self.normalize(part)
+                if not key:
+                    continue
+                docs = values.get(key)
+                if docs is None:
+                    values[key] = array('I', [idx])
+                elif isinstance(docs, int):
+                    values[key] = docs | 1 << idx
+                elif docs[-1] != idx:  # a value repeated within one cell
+                    docs.append(idx)
+
+    def extend(self, other):
+        """Append the documents of other (indexed from doc 0, not yet compacted)"""
+        base = self.n_docs
+        n_docs = base + other.n_docs
+        for col, values in other.values.items():
+            mine = self.values[col]
+            for key, docs in values.items():
+                shifted = [idx + base for idx in docs] if base else docs
+                target = mine.get(key)
+                if target is None:
+                    mine[key] = array('I', shifted)
+                elif isinstance(target, int):
+                    mine[key] = target | _bitmap(shifted, n_docs)
+                else:
+                    target.extend(shifted)
+        self.n_docs = n_docs
+
+    def compact(self):
+        """Store dense values as bitmaps"""
+        for values in self.values.values():
+            for key, docs in values.items():
+                if not isinstance(docs, int) and len(docs) * 32 >= self.n_docs:
+                    values[key] = _bitmap(docs, self.n_docs)
+        return self
+
+    def copy(self):
+        """Independent copy (for appending without touching a shared index)"""
+        facets = object.__new__(_FacetIndex)
+        facets.separators = self.separators
+        facets.null = self.null
+        facets.n_docs = self.n_docs
+        facets.values = {col: {key: docs if isinstance(docs, int) else array('I', docs)
+                               for key, docs in values.items()}
+                         for col, values in self.values.items()}
+        return facets
+
+    def match(self, filters):
+        """Sorted doc ids matching filters ({column: value or list of values})"""
+        selected = None
+        for col, wanted in filters.items():
+            values = self.values[col]
+            if isinstance(wanted, (str, int)):
+                wanted = [wanted]
+            bits = 0
+            for value in wanted:
+                docs = values.get(self.normalize(value))
+                if docs is not None:
+                    bits |= docs if isinstance(docs, int) else _bitmap(docs, self.n_docs)
+            selected = bits if selected is None else selected & bits
+            if not selected:
+                return []
+        return _bitmap_ids(selected) if selected is not None else list(range(self.n_docs))
+
+    def nbytes(self):
+        """Approximate bytes held by the value indexes"""
+        return sum(sys.getsizeof(key) + (docs.itemsize * len(docs) if isinstance(docs, array) else sys.getsizeof(docs))
+                   for values in self.values.values() for key, docs in values.items())
+
+    def to_state(self):
+        """Plain-data form for index_store (arrays as (typecode, bytes))"""
+        return {
+            "separators": list(self.separators.items()),
+            "null": self.null,
+            "n_docs": self.n_docs,
+            "values": {col: {key: docs if isinstance(docs, int) else (docs.typecode, docs.tobytes())
+                             for key, docs in values.items()}
+                       for col, values in self.values.items()}
+        }
+
+    @classmethod
+    def from_state(cls, state):
+        """Rebuild a facet index saved with to_state()"""
+        facets = object.__new__(cls)
+        facets.separators = dict(state["separators"])
+        facets.null = state["null"]
+        facets.n_docs = state["n_docs"]
+        facets.values = {}
+        for col, values in state["values"].items():
+            facets.values[col] = {}
+            for key, docs in values.items():
+                if not isinstance(docs, int):
+                    typecode, data = docs
+                    docs = array(typecode)
+                    docs.frombytes(data)
+                facets.values[col][key] = docs
+        return facets
+
+
+# ============ CSV ROWS ============
+class _UnsupportedCsv(Exception):
+    """CSV layout the streaming loader cannot reproduce exactly (bare CR line breaks)"""
+
+
+class _CsvScanner:
+    """One pass over a binary CSV file, parsed as csv.DictReader parses _load_csv's text stream.
+
+    Lines are split on b"\\n" and CRLF is folded to LF, which matches
+    universal-newline decoding for every file without bare CR line breaks;
+    those raise _UnsupportedCsv. The scanner tracks the byte position of the
+    next unread line and a running CRC-32 of everything read.
+    """
+
+    def __init__(self, f, crc=0):
+        import csv  # not needed when a prebuilt index is used
+        import zlib
+
+        self._f = f
+        self._crc32 = zlib.crc32
+        self.pos = f.tell()
+        self.crc = crc
+        self._reader = csv.reader(self._lines())
+
+    def _lines(self):
+        for raw in self._f:
+            self.pos += len(raw)
+            self.crc = self._crc32(raw, self.crc)
+            if raw.endswith(b"\r\n"):
+                raw = raw[:-2] + b"\n"
+            if b"\r" in raw:
+                raise _UnsupportedCsv()
+            yield raw.decode('utf-8')
+
+    def header(self):
+        """Field names from the next record (None at end of file)"""
+        return next(self._reader, None)
+
+    def records(self):
+        """Yield (byte offset, fields) per record, skipping blank lines like DictReader"""
+        while True:
+            # csv.reader never reads ahead, so the next unread line starts the record
+            offset = self.pos
+            fields = next(self._reader, None)
+            if fields is None:
+                return
+            if fields:
+                yield offset, fields
+
+
+def _field_getter(fieldnames, cols, null=None, null_as=None):
+    """Map a record's field list to values of cols, as DictReader rows' .get(col, "") would.
+
+    Columns missing from the header give "", fields missing from a short
+    record give None, and duplicate header names resolve to the last one.
+    Cells equal to null (the source's null literal, if any) give null_as.
+    """
+    positions = {name: i for i, name in enumerate(fieldnames)}
+    picks = [positions.get(col) for col in cols]
+
+    def get(fields):
+        n = len(fields)
+        return ["" if i is None else fields[i] if i < n else None for i in picks]
+
+    def get_nullable(fields):
+        return [null_as if value == null else value for value in get(fields)]
+    return get if null is None else get_nullable
+
+
+def _scan_csv(scanner, fieldnames, search_cols, options=None):
+    """Search documents, record offsets and facet index (or None) for the remaining records of scanner"""
+    null = options.null_value if options else None
+    values = _field_getter(fieldnames, search_cols, null, "")
+    facets = _FacetIndex(options) if options and options.facet_cols else None
+    cells = _field_getter(fieldnames, options.facet_cols) if facets else None
+    documents = []
+    offsets = array('Q')
+    for offset, fields in scanner.records():
+        offsets.append(offset)
+        documents.append(" ".join(str(value) for value in values(fields)))
+        if facets is not None:
+            facets.add(cells(fields))
+    return documents, offsets, facets
+
+
+class _MemoryRows(list):
+    """Projected output rows held in memory (files with bare CR line breaks)"""
+
+    __slots__ = ()
+
+    def extended(self, signature, rows):
+        """A new row store with rows appended"""
+        return _MemoryRows(self + rows)
+
+    def fetch(self, ids):
+        """Copies of the rows at ids (callers may edit them)"""
+        return [dict(self[idx]) for idx in ids]
+
+
+class _RowStore:
+    """Base for row stores that decode rows on demand.
+
+    Subclasses implement _read(); fetch() adds a per-store LRU of the most
+    recently fetched rows, so hot results are not decoded again.
+    """
+
+    __slots__ = ("_cache", "_lock")
+
+    def __init__(self):
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _read(self, ids):
+        """{idx: row} for sorted, uncached ids, or None if the source changed"""
+        raise NotImplementedError
+
+    def fetch(self, ids):
+        """Copies of the rows at ids, or None if the source changed since it was indexed"""
+        rows = {}
+        with self._lock:
+            for idx in ids:
+                row = self._cache.get(idx)
+                if row is not None:
+                    self._cache.move_to_end(idx)
+                    rows[idx] = row
+        missing = sorted(set(ids) - rows.keys())
+        if missing:
+            read = self._read(missing)
+            if read is None:
+                return None
+            rows.update(read)
+            with self._lock:
+                self._cache.update(read)
+                while len(self._cache) > ROW_CACHE_SIZE:
+                    self._cache.popitem(last=False)
+        return [dict(rows[idx]) for idx in ids]
+
+
+class _CsvRows(_RowStore):
+    """Projected output rows read back from the CSV on demand.
+
+    Only the byte offset of each record is kept; _read() re-parses just the
+    records a search returns.
+    """
+
+    __slots__ = ("filepath", "signature", "fieldnames", "output_cols", "offsets", "null", "_columns")
+
+    def __init__(self, filepath, signature, fieldnames, output_cols, offsets, null=None):
+        super().__init__()
+        self.filepath = filepath
+        self.signature = signature
+        self.fieldnames = fieldnames
+        self.output_cols = output_cols
+        self.offsets = offsets
+        self.null = null  # cells with this text are returned as None
+        # DictReader rows have a key for every header name, so `col in row` is a header check
+        self._columns = [col for col in output_cols if col in fieldnames]
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def extended(self, signature, offsets):
+        """A new row store for the same file with records appended at offsets"""
+        return _CsvRows(self.filepath, signature, self.fieldnames, self.output_cols, self.offsets + offsets, self.null)
+
+    def _read(self, ids):
+        values = _field_getter(self.fieldnames, self._columns, self.null)
+        rows = {}
+        with open(self.filepath, 'rb') as f:
+            stat = os.fstat(f.fileno())
+            if (stat.st_mtime_ns, stat.st_size) != self.signature:
+                return None
+            for idx in ids:
+                f.seek(self.offsets[idx])
+                fields = next(_CsvScanner(f).records())[1]
+                rows[idx] = dict(zip(self._columns, values(fields)))
+        return rows
 
 
 # ============ SEARCH FUNCTIONS ============
 def _load_csv(filepath):
     """Load CSV and return list of dicts"""
+    import csv  # not needed when a prebuilt index is used
+
     with open(filepath, 'r', encoding='utf-8') as f:
         return list(csv.DictReader(f))
 
 
-def _search_csv(filepath, search_cols, output_cols, query, max_results):
-    """Core search function using BM25"""
-    if not filepath.exists():
-        return []
+def _project(data, search_cols, output_cols, options=None):
+    """Search documents, projected output rows and facet index (or None) for parsed CSV rows.
 
-    data = _load_csv(filepath)
+    Cells holding the source's null literal read as empty text for search
+    and as None in output rows.
+    """
+    null = options.null_value if options else None
+    if null is None:
+        documents = [" ".join(str(row.get(col, "")) for col in search_cols) for row in data]
+        rows = [{col: row.get(col, "") for col in output_cols if col in row} for row in data]
+    else:
+        documents = [" ".join("" if row.get(col, "") == null else str(row.get(col, "")) for col in search_cols)
+                     for row in data]
+        rows = [{col: None if row.get(col, "") == null else row.get(col, "") for col in output_cols if col in row}
+                for row in data]
+    facets = None
+    if options and options.facet_cols:
+        facets = _FacetIndex(options)
+        for row in data:
+            facets.add([row.get(col) for col in options.facet_cols])
+        facets.compact()
+    return documents, rows, facets
 
-    # Build documents from search columns
-    documents = [" ".join(str(row.get(col, "")) for col in search_cols) for row in data]
 
-    # BM25 search
-    bm25 = BM25()
+def _fit_csv(filepath, search_cols, output_cols, options=None):
+    """Parse a CSV, fit BM25 over its search columns and project output columns.
+
+    Returns (rows, bm25, facets); facets is None without facet columns.
+    """
+    documents, rows, facets = _project(_load_csv(filepath), search_cols, output_cols, options)
+    bm25 = bm25_class(len(documents))()
     bm25.fit(documents)
-    ranked = bm25.score(query)
+    return rows, bm25, facets
 
-    # Get top results with score > 0
-    results = []
-    for idx, score in ranked[:max_results]:
-        if score > 0:
-            row = data[idx]
-            results.append({col: row.get(col, "") for col in output_cols if col in row})
 
+def _file_digest(filepath):
+    """CRC-32 of a file's contents, to recognise appends (see _append_index)"""
+    import zlib  # only needed once an index is built
+
+    crc = 0
+    with open(filepath, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 16), b""):
+            crc = zlib.crc32(block, crc)
+    return crc
+
+
+def _stream_fit(filepath, search_cols, output_cols, signature, options=None):
+    """Fit filepath in one streaming pass, keeping only the search columns and record offsets.
+
+    Output rows are read back for the hits a search returns. Returns None for
+    CSVs the streaming scanner cannot parse exactly (see _CsvScanner).
+    """
+    try:
+        with open(filepath, 'rb') as f:
+            scanner = _CsvScanner(f)
+            fieldnames = scanner.header() or []
+            documents, offsets, facets = _scan_csv(scanner, fieldnames, search_cols, options)
+    except _UnsupportedCsv:
+        return None
+    bm25 = bm25_class(len(documents))()
+    bm25.fit(documents)
+    null = options.null_value if options else None
+    rows = _CsvRows(filepath, signature, fieldnames, list(output_cols), offsets, null)
+    return _IndexEntry(signature, rows, bm25, scanner.crc, facets and facets.compact())
+
+
+def _build_index(filepath, search_cols, output_cols, signature, options=None):
+    """Load a fresh prebuilt index for filepath, or fit one from the CSV.
+
+    Large CSVs are fitted in worker processes when several CPUs are
+    available (see parallel_build.py), others in a single streaming pass.
+    """
+    from index_store import load_index
+
+    prebuilt = load_index(filepath, search_cols, output_cols, options)
+    if prebuilt is not None:
+        rows, bm25, facets, digest = prebuilt
+        return _IndexEntry(signature, rows, bm25, digest, facets)
+    entry = None
+    if BUILD_WORKERS > 1 and signature[1] >= PARALLEL_MIN_BYTES:
+        from parallel_build import build_sharded
+        entry = build_sharded(filepath, search_cols, output_cols, signature, BUILD_WORKERS, options)
+    entry = entry or _stream_fit(filepath, search_cols, output_cols, signature, options)
+    if entry is None:
+        rows, bm25, facets = _fit_csv(filepath, search_cols, output_cols, options)
+        entry = _IndexEntry(signature, _MemoryRows(rows), bm25, _file_digest(filepath), facets)
+    return entry
+
+
+def _append_index(entry, filepath, search_cols, output_cols, signature, options=None):
+    """Extend entry with rows appended to filepath since it was built.
+
+    Returns a new _IndexEntry (entry itself is left untouched for concurrent
+    readers), or None when the file changed in any other way and needs a
+    full rebuild. The old contents must be an unchanged prefix that ends on
+    a record boundary, so the appended rows parse exactly as they would in a
+    full read.
+    """
+    import zlib
+
+    old_size = entry.signature[1]
+    if entry.digest is None or signature[1] <= old_size:
+        return None
+    with open(filepath, 'rb') as f:
+        crc = quotes = 0
+        last = b""
+        while f.tell() < old_size:
+            block = f.read(min(old_size - f.tell(), 1 << 16))
+            if not block:
+                return None
+            crc = zlib.crc32(block, crc)
+            quotes += block.count(b'"')
+            last = block[-1:]
+        if crc != entry.digest or last != b"\n" or quotes % 2:
+            return None
+
+        try:
+            f.seek(0)
+            fieldnames = _CsvScanner(f).header()
+            if not fieldnames:
+                return None
+            f.seek(old_size)
+            scanner = _CsvScanner(f, crc)
+            facets = entry.facets.copy() if entry.facets is not None else None
+            if isinstance(entry.rows, _CsvRows):
+                documents, offsets, added_facets = _scan_csv(scanner, fieldnames, search_cols, options)
+                rows = entry.rows.extended(signature, offsets)
+                if facets is not None:
+                    facets.extend(added_facets)
+            else:
+                null = options.null_value if options else None
+                search_values = _field_getter(fieldnames, search_cols, null, "")
+                columns = [col for col in output_cols if col in fieldnames]
+                output_values = _field_getter(fieldnames, columns, null)
+                cells = _field_getter(fieldnames, options.facet_cols) if facets is not None else None
+                documents = []
+                added = []
+                for _, fields in scanner.records():
+                    documents.append(" ".join(str(value) for value in search_values(fields)))
+                    added.append(dict(zip(columns, output_values(fields))))
+                    if facets is not None:
+                        facets.add(cells(fields))
+                rows = entry.rows.extended(signature, added)
+        except (_UnsupportedCsv, UnicodeDecodeError):
+            return None
+
+    bm25 = entry.bm25.copy()
+    bm25.add_documents(documents)
+    bm25.refresh()  # before publishing: readers must never refresh a shared index
+    return _IndexEntry(signature, rows, bm25, scanner.crc, facets and facets.compact())
+
+
+def _resolve_filters(filters, facet_cols):
+    """Map filter column names onto facet_cols case-insensitively.
+
+    Returns ({column: [values]}, None), or (None, error message) when a
+    column cannot be filtered on or a value is not a str or int (or a list
+    of them).
+    """
+    if not isinstance(filters, dict):
+        return None, "Filters must map column names to a value or a list of values"
+    columns = {col.casefold(): col for col in facet_cols}
+    resolved = {}
+    for col, values in filters.items():
+        name = columns.get(str(col).strip().casefold())
+        if name is None:
+            available = ", ".join(facet_cols) or "none"
+            return None, f"Cannot filter on '{col}'. Filterable columns: {available}"
+        if isinstance(values, (str, int)):
+            values = [values]
+        elif not (isinstance(values, (list, tuple)) and all(isinstance(value, (str, int)) for value in values)):
+            return None, f"Filter '{col}' takes a string or an integer, or a list of them (got {values!r})"
+        resolved.setdefault(name, []).extend(values)
+    return resolved, None
+
+
+def _ranked_ids(entry, query, max_results, filters=None):
+    """Doc ids of the top max_results hits, among the filter matches when filters are given"""
+    docs = entry.facets.match(filters) if filters and entry.facets is not None else None
+    return [idx for idx, score in entry.bm25.top_k(query, max_results, docs)]
+
+
+def _search_csv(filepath, search_cols, output_cols, query, max_results, name=None, options=None, filters=None):
+    """Core search function using BM25; results are cached under name when given.
+
+    filters ({facet column: value or values}, see _resolve_filters) narrow
+    the candidates through the facet index before any scoring.
+    """
+    if not filepath.exists():
+        return []
+
+    entry = _INDEXES.get(filepath, search_cols, output_cols, options)
+
+    if name is None:
+        ids = _ranked_ids(entry, query, max_results, filters)
+    else:
+        key = _RESULTS.key(name, query, max_results, filters)
+        ids = _RESULTS.get(key, entry)
+        if ids is None:
+            ids = _ranked_ids(entry, query, max_results, filters)
+            _RESULTS.put(key, entry, ids)
+
+    # Top results with score > 0 (copies, so callers cannot edit the cache)
+    results = entry.rows.fetch(ids)
+    if results is None:
+        # The CSV changed between the index lookup and reading the rows: search the new version
+        return _search_csv(filepath, search_cols, output_cols, query, max_results, name, options, filters)
     return results
 
 
+def detect_domain_scores(query):
+    """Keyword hits per domain for query (see DOMAIN_KEYWORDS), in one pass over the query"""
+    return ROUTER.counts("domain", query.lower())
+
+
+def _best_domain(scores):
+    """Domain with most hits (first in DOMAIN_KEYWORDS order on ties), "style" if none"""
+    best = max(scores, key=scores.get)
+    return best if scores[best] > 0 else "style"
+
+
 def detect_domain(query):
     """Auto-detect the most relevant domain from query"""
-    query_lower = query.lower()
-
-    domain_keywords = {
-        "color": ["color", "palette", "hex", "#", "rgb"],
-        "chart": ["chart", "graph", "visualization", "trend", "bar", "pie", "scatter", "heatmap", "funnel"],
-        "landing": ["landing", "page", "cta", "conversion", "hero", "testimonial", "pricing", "section"],
-        "product": ["saas", "ecommerce", "e-commerce", "fintech", "healthcare", "gaming", "portfolio", "crypto", "dashboard"],
-        "style": ["style", "design", "ui", "minimalism", "glassmorphism", "neumorphism", "brutalism", "dark mode", "flat", "aurora", "prompt", "css", "implementation", "variable", "checklist", "tailwind"],
-        "ux": ["ux", "usability", "accessibility", "wcag", "touch", "scroll", "animation", "keyboard", "navigation", "mobile"],
-        "typography": ["font", "typography", "heading", "serif", "sans"],
-        "icons": ["icon", "icons", "lucide", "heroicons", "symbol", "glyph", "pictogram", "svg icon"],
-        "react": ["react", "next.js", "nextjs", "suspense", "memo", "usecallback", "useeffect", "rerender", "bundle", "waterfall", "barrel", "dynamic import", "rsc", "server component"],
-        "web": ["aria", "focus", "outline", "semantic", "virtualize", "autocomplete", "form", "input type", "preconnect"]
+    return _best_domain(detect_domain_scores(query))
+
+
+def route_query(query, min_confidence=ROUTE_MIN_CONFIDENCE):
+    """detect_domain() with the evidence behind it.
+
+    confidence is the chosen domain's share of all keyword hits (0.0 when
+    nothing matched, so the "style" default is a guess). When ambiguous -
+    confidence below min_confidence - callers can search candidates (every
+    domain with a hit, best first) together, e.g.
+    search_all(query, domains=route["candidates"]), instead of trusting one
+    domain.
+    """
+    scores = detect_domain_scores(query)
+    domain = _best_domain(scores)
+    total = sum(scores.values())
+    confidence = scores[domain] / total if total else 0.0
+    candidates = sorted((name for name, hits in scores.items() if hits), key=lambda name: -scores[name])
+    return {
+        "domain": domain,
+        "confidence": confidence,
+        "ambiguous": confidence < min_confidence,
+        "candidates": candidates,
+        "scores": scores
     }
 
-    scores = {domain: sum(1 for kw in keywords if kw in query_lower) for domain, keywords in domain_keywords.items()}
-    best = max(scores, key=scores.get)
-    return best if scores[best] > 0 else "style"
 
+def search(query, domain=None, max_results=MAX_RESULTS, filters=None):
+    """Main search function with auto-domain detection.
 
-def search(query, domain=None, max_results=MAX_RESULTS):
-    """Main search function with auto-domain detection"""
+    filters maps facet columns of the domain (its facet_cols) to a value or
+    list of values: rows must match one value of every filtered column.
+    """
     if domain is None:
         domain = detect_domain(query)
 
     config = CSV_CONFIG.get(domain, CSV_CONFIG["style"])
     filepath = DATA_DIR / config["file"]
 
+    if filters:
+        filters, error = _resolve_filters(filters, config.get("facet_cols", []))
+        if error:
+            return {"error": error, "domain": domain}
+
     if not filepath.exists():
         return {"error": f"File not found: {filepath}", "domain": domain}
 
-    results = _search_csv(filepath, config["search_cols"], config["output_cols"], query, max_results)
+    results = _search_csv(filepath, config["search_cols"], config["output_cols"], query, max_results, name=domain,
+                          options=source_options(config), filters=filters)
 
-    return {
+    response = {
         "domain": domain,
         "query": query,
-        "file": config["file"],
+        "file": source_file(filepath),
         "count": len(results),
         "results": results
     }
+    if filters:
+        response["filters"] = filters
+    return response
+
+
+def search_many(requests):
+    """Run several searches, scoring each domain's requests in one pass.
+
+    requests is a list of (query, domain, max_results) tuples; domain None is
+    auto-detected as in search(). Requests are grouped by domain and served
+    from the result cache where possible; each domain's remaining distinct
+    queries are scored with a single BM25.top_k_batch call. Returns one
+    search()-shaped dict per request, in request order.
+    """
+    responses = [None] * len(requests)
+    groups = {}
+    for pos, (query, domain, max_results) in enumerate(requests):
+        if domain is None:
+            domain = detect_domain(query)
+        groups.setdefault(domain, []).append((pos, query, max_results))
+
+    for domain, items in groups.items():
+        config = CSV_CONFIG.get(domain, CSV_CONFIG["style"])
+        filepath = DATA_DIR / config["file"]
+
+        if not filepath.exists():
+            for pos, _, _ in items:
+                responses[pos] = {"error": f"File not found: {filepath}", "domain": domain}
+            continue
+
+        entry = _INDEXES.get(filepath, config["search_cols"], config["output_cols"], source_options(config))
+        keys = [_RESULTS.key(domain, query, max_results) for _, query, max_results in items]
+        ids = [_RESULTS.get(key, entry) for key in keys]
+        missed = [item for item, cached in zip(items, ids) if cached is None]
+        if missed:
+            queries = list(dict.fromkeys(query for _, query, _ in missed))
+            k = max(max_results for _, _, max_results in missed)
+            ranked = dict(zip(queries, entry.bm25.top_k_batch(queries, k)))
+
+        for i, (pos, query, max_results) in enumerate(items):
+            if ids[i] is None:
+                ids[i] = [idx for idx, _ in ranked[query][:max(max_results, 0)]]
+                _RESULTS.put(keys[i], entry, ids[i])
+            results = entry.rows.fetch(ids[i])
+            if results is None:
+                # The CSV changed while this batch ran: start over against the new version
+                return search_many(requests)
+            responses[pos] = {
+                "domain": domain,
+                "query": query,
+                "file": source_file(filepath),
+                "count": len(results),
+                "results": results
+            }
+
+    return responses
+
+
+def search_all(query, max_results=MAX_RESULTS, domains=None):
+    """Search every domain and stack in one pass over the cross-domain index.
+
+    Instead of routing the query to one domain with detect_domain, all
+    postings of the query terms are scored once against corpus-wide
+    statistics. domains optionally restricts the search to a subset of names
+    ("style", "stack:react", ...); only those domains' stretches of each
+    posting list are then read. Returns per-domain top max_results under
+    "by_domain" plus the global top max_results under "results".
+    """
+    index = _get_global_index()
+    ranges = None if domains is None else index.ranges(domains)
+
+    per_domain = {}
+    matched = []
+    for idx, score in index.bm25._accumulate(tokenize_query(query), ranges).items():
+        per_domain.setdefault(index.domain_of(idx), []).append((idx, score))
+        matched.append((idx, score))
+
+    def best(candidates):
+        return heapq.nsmallest(max(max_results, 0), candidates, key=lambda x: (-x[1], x[0]))
+
+    by_domain = {}
+    for name in index.names:
+        if name in per_domain:
+            results = [dict(index.rows[idx]) for idx, _ in best(per_domain[name])]
+            by_domain[name] = {"file": index.files[name], "count": len(results), "results": results}
+
+    results = []
+    for idx, _ in best(matched):
+        name = index.domain_of(idx)
+        results.append({"domain": name, "file": index.files[name], **index.rows[idx]})
+
+    return {
+        "domain": "all",
+        "query": query,
+        "count": len(results),
+        "results": results,
+        "by_domain": by_domain
+    }
 
 
-def search_stack(query, stack, max_results=MAX_RESULTS):
-    """Search stack-specific guidelines"""
+def search_stack(query, stack, max_results=MAX_RESULTS, filters=None):
+    """Search stack-specific guidelines, optionally filtered on Category / Severity (see search())"""
     if stack not in STACK_CONFIG:
         return {"error": f"Unknown stack: {stack}. Available: {', '.join(AVAILABLE_STACKS)}"}
 
+    if filters:
+        filters, error = _resolve_filters(filters, _STACK_COLS["facet_cols"])
+        if error:
+            return {"error": error, "stack": stack}
+
     filepath = DATA_DIR / STACK_CONFIG[stack]["file"]
 
     if not filepath.exists():
         return {"error": f"Stack file not found: {filepath}", "stack": stack}
 
-    results = _search_csv(filepath, _STACK_COLS["search_cols"], _STACK_COLS["output_cols"], query, max_results)
+    results = _search_csv(filepath, _STACK_COLS["search_cols"], _STACK_COLS["output_cols"], query, max_results,
+                          name=f"stack:{stack}", options=source_options(_STACK_COLS), filters=filters)
 
-    return {
+    response = {
         "domain": "stack",
         "stack": stack,
         "query": query,
@@ -251,3 +1811,6 @@ def search_stack(query, stack, max_results=MAX_RESULTS):
         "count": len(results),
         "results": results
     }
+    if filters:
+        response["filters"] = filters
+    return response
@@ -16,13 +16,19 @@ Usage:
 import csv
 import json
 import os
+import re
+import threading
+from collections import OrderedDict
+from copy import deepcopy
 from datetime import datetime
 from pathlib import Path
-from core import search, DATA_DIR
+from core import search, search_many, CSV_CONFIG, DATA_DIR
+from matcher import ROUTER, RuleMatcher
 
 
 # ============ CONFIGURATION ============
 REASONING_FILE = "ui-reasoning.csv"
+DESIGN_CACHE_SIZE = 256  # Generated design systems kept by generate_design_system
 
 SEARCH_CONFIG = {
     "product": {"max_results": 1},
@@ -33,12 +39,31 @@ SEARCH_CONFIG = {
 }
 
 
+# Common page types and the context keywords that identify them, in priority order
+PAGE_PATTERNS = [
+    (["dashboard", "admin", "analytics", "data", "metrics", "stats", "monitor", "overview"], "Dashboard / Data View"),
+    (["checkout", "payment", "cart", "purchase", "order", "billing"], "Checkout / Payment"),
+    (["settings", "profile", "account", "preferences", "config"], "Settings / Profile"),
+    (["landing", "marketing", "homepage", "hero", "home", "promo"], "Landing / Marketing"),
+    (["login", "signin", "signup", "register", "auth", "password"], "Authentication"),
+    (["pricing", "plans", "subscription", "tiers", "packages"], "Pricing / Plans"),
+    (["blog", "article", "post", "news", "content", "story"], "Blog / Article"),
+    (["product", "item", "detail", "pdp", "shop", "store"], "Product Detail"),
+    (["search", "results", "browse", "filter", "catalog", "list"], "Search Results"),
+    (["empty", "404", "error", "not found", "zero"], "Empty State"),
+]
+ROUTER.add_table("page", [(page_type, keywords) for keywords, page_type in PAGE_PATTERNS])
+
+
 # ============ DESIGN SYSTEM GENERATOR ============
 class DesignSystemGenerator:
     """Generates design system recommendations from aggregated searches."""
 
     def __init__(self):
         self.reasoning_data = self._load_reasoning()
+        # Compiled once: rule lookup by UI_Category and each rule's parsed fields
+        self._rules = RuleMatcher([rule.get("UI_Category", "") for rule in self.reasoning_data])
+        self._reasoning = [self._compile_rule(rule) for rule in self.reasoning_data]
 
     def _load_reasoning(self) -> list:
         """Load reasoning rules from CSV."""
@@ -48,60 +73,29 @@ class DesignSystemGenerator:
         with open(filepath, 'r', encoding='utf-8') as f:
             return list(csv.DictReader(f))
 
-    def _multi_domain_search(self, query: str, style_priority: list = None) -> dict:
-        """Execute searches across multiple domains."""
-        results = {}
-        for domain, config in SEARCH_CONFIG.items():
+    def _multi_domain_search(self, query: str, style_priority: list = None, known: dict = None) -> dict:
+        """Execute searches across multiple domains in one batched pass.
+
+        Domains already present in known (e.g. the product lookup) are reused.
+        """
+        results = dict(known or {})
+        domains = [domain for domain in SEARCH_CONFIG if domain not in results]
+        requests = []
+        for domain in domains:
+            config = SEARCH_CONFIG[domain]
             if domain == "style" and style_priority:
                 # For style, also search with priority keywords
                 priority_query = " ".join(style_priority[:2]) if style_priority else query
                 combined_query = f"{query} {priority_query}"
-                results[domain] = search(combined_query, domain, config["max_results"])
+                requests.append((combined_query, domain, config["max_results"]))
             else:
-                results[domain] = search(query, domain, config["max_results"])
+                requests.append((query, domain, config["max_results"]))
+        results.update(zip(domains, search_many(requests)))
         return results
 
-    def _find_reasoning_rule(self, category: str) -> dict:
-        """Find matching reasoning rule for a category."""
-        category_lower = category.lower()
-
-        # Try exact match first
-        for rule in self.reasoning_data:
-            if rule.get("UI_Category", "").lower() == category_lower:
-                return rule
-
-        # Try partial match
-        for rule in self.reasoning_data:
-            ui_cat = rule.get("UI_Category", "").lower()
-            if ui_cat in category_lower or category_lower in ui_cat:
-                return rule
-
-        # Try keyword match
-        for rule in self.reasoning_data:
-            ui_cat = rule.get("UI_Category", "").lower()
-            keywords = ui_cat.replace("/", " ").replace("-", " ").split()
-            if any(kw in category_lower for kw in keywords):
-                return rule
-
-        return {}
-
-    def _apply_reasoning(self, category: str, search_results: dict) -> dict:
-        """Apply reasoning rules to search results."""
-        rule = self._find_reasoning_rule(category)
-
-        if not rule:
-            return {
-                "pattern": "Hero + Features + CTA",
-                "style_priority": ["Minimalism", "Flat Design"],
-                "color_mood": "Professional",
-                "typography_mood": "Clean",
-                "key_effects": "Subtle hover transitions",
-                "anti_patterns": "",
-                "decision_rules": {},
-                "severity": "MEDIUM"
-            }
-
-        # Parse decision rules JSON
+    @staticmethod
+    def _compile_rule(rule: dict) -> dict:
+        """Reasoning fields of one rule, with its Decision_Rules JSON parsed."""
         decision_rules = {}
         try:
             decision_rules = json.loads(rule.get("Decision_Rules", "{}"))
@@ -119,6 +113,32 @@ class DesignSystemGenerator:
             "severity": rule.get("Severity", "MEDIUM")
         }
 
+    def _apply_reasoning(self, category: str, search_results: dict) -> dict:
+        """Apply reasoning rules to search results.
+
+        The rule is the first exact UI_Category match, then partial match,
+        then keyword match in file order (see matcher.RuleMatcher).
+        """
+        idx = self._rules.match(category)
+
+        if idx is None:
+            return {
+                "pattern": "Hero + Features + CTA",
+                "style_priority": ["Minimalism", "Flat Design"],
+                "color_mood": "Professional",
+                "typography_mood": "Clean",
+                "key_effects": "Subtle hover transitions",
+                "anti_patterns": "",
+                "decision_rules": {},
+                "severity": "MEDIUM"
+            }
+
+        # Copies, so callers cannot edit the compiled rule
+        reasoning = dict(self._reasoning[idx])
+        reasoning["style_priority"] = list(reasoning["style_priority"])
+        reasoning["decision_rules"] = dict(reasoning["decision_rules"])
+        return reasoning
+
     def _select_best_match(self, results: list, priority_keywords: list) -> dict:
         """Select best matching result based on priority keywords."""
         if not results:
@@ -174,8 +194,7 @@ class DesignSystemGenerator:
         style_priority = reasoning.get("style_priority", [])
 
         # Step 3: Multi-domain search with style priority hints
-        search_results = self._multi_domain_search(query, style_priority)
-        search_results["product"] = product_result  # Reuse product search
+        search_results = self._multi_domain_search(query, style_priority, known={"product": product_result})
 
         # Step 4: Select best matches from each domain using priority
         style_results = self._extract_results(search_results.get("style", {}))
@@ -458,9 +477,74 @@ def format_markdown(design_system: dict) -> str:
     return "\n".join(lines)
 
 
+# ============ MEMOIZED GENERATION ============
+_generator = None
+_generator_signature = None
+_design_cache = OrderedDict()  # (normalized query, project name, data version) -> design system
+_design_lock = threading.Lock()
+
+
+def _signature(filepath):
+    """(mtime_ns, size) of a data file, or None if it is missing"""
+    try:
+        stat = filepath.stat()
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def data_version():
+    """Version of every data file a design system is derived from.
+
+    File signatures (mtime and size), as the index registry uses: editing
+    the reasoning rules or any searched CSV changes the version.
+    """
+    files = [REASONING_FILE] + [CSV_CONFIG[domain]["file"] for domain in SEARCH_CONFIG]
+    return tuple((name, _signature(DATA_DIR / name)) for name in files)
+
+
+def _get_generator():
+    """Shared DesignSystemGenerator, reloaded when the reasoning rules change"""
+    global _generator, _generator_signature
+    signature = _signature(DATA_DIR / REASONING_FILE)
+    with _design_lock:
+        if _generator is None or _generator_signature != signature:
+            _generator, _generator_signature = DesignSystemGenerator(), signature
+        return _generator
+
+
+def _generate(query: str, project_name: str = None) -> dict:
+    """DesignSystemGenerator().generate(), memoized per normalized query, project name and data version.
+
+    Queries differing only in case or whitespace tokenize the same, so they
+    share an entry; the default project name still comes from the query as
+    given. Returns a copy the caller may modify.
+    """
+    key = (" ".join(query.lower().split()), project_name, data_version())
+    with _design_lock:
+        design_system = _design_cache.get(key)
+        if design_system is not None:
+            _design_cache.move_to_end(key)
+    if design_system is None:
+        design_system = _get_generator().generate(query, project_name)
+        with _design_lock:
+            _design_cache[key] = design_system
+            while len(_design_cache) > DESIGN_CACHE_SIZE:
+                _design_cache.popitem(last=False)
+    design_system = deepcopy(design_system)
+    design_system["project_name"] = project_name or query.upper()
+    return design_system
+
+
+def clear_design_cache():
+    """Forget memoized design systems (they are regenerated on next use)"""
+    with _design_lock:
+        _design_cache.clear()
+
+
 # ============ MAIN ENTRY POINT ============
 def generate_design_system(query: str, project_name: str = None, output_format: str = "ascii", 
-                           persist: bool = False, page: str = None, output_dir: str = None) -> str:
+                           persist: bool = False, page=None, output_dir: str = None) -> str:
     """
     Main entry point for design system generation.
 
@@ -469,14 +553,13 @@ def generate_design_system(query: str, project_name: str = None, output_format:
         project_name: Optional project name for output header
         output_format: "ascii" (default) or "markdown"
         persist: If True, save design system to design-system/ folder
-        page: Optional page name for page-specific override file
+        page: Optional page name (or list of page names) for page-specific override files
         output_dir: Optional output directory (defaults to current working directory)
 
     Returns:
         Formatted design system string
     """
-    generator = DesignSystemGenerator()
-    design_system = generator.generate(query, project_name)
+    design_system = _generate(query, project_name)
     
     # Persist to files if requested
     if persist:
@@ -488,18 +571,48 @@ def generate_design_system(query: str, project_name: str = None, output_format:
 
 
 # ============ PERSISTENCE FUNCTIONS ============
-def persist_design_system(design_system: dict, page: str = None, output_dir: str = None, page_query: str = None) -> dict:
+_GENERATED_LINE = re.compile(r'^.*\*\*Generated:\*\* .*$', re.M)
+
+
+def _write_if_changed(path: Path, content: str) -> bool:
+    """Atomically write content to path unless it already holds it (timestamp lines aside).
+
+    Returns True if the file was written.
+    """
+    try:
+        current = path.read_text(encoding='utf-8')
+    except (OSError, UnicodeDecodeError):
+        current = None
+    if current is not None and _GENERATED_LINE.sub("", current) == _GENERATED_LINE.sub("", content):
+        return False
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        with open(tmp, 'w', encoding='utf-8') as f:
+            f.write(content)
+        os.replace(tmp, path)
+    finally:
+        if tmp.exists():
+            tmp.unlink()
+    return True
+
+
+def persist_design_system(design_system: dict, page=None, output_dir: str = None, page_query: str = None) -> dict:
     """
     Persist design system to design-system/<project>/ folder using Master + Overrides pattern.
     
     Args:
         design_system: The generated design system dictionary
-        page: Optional page name for page-specific override file
+        page: Optional page name, or list of page names, for page-specific override files
         output_dir: Optional output directory (defaults to current working directory)
         page_query: Optional query string for intelligent page override generation
     
     Returns:
-        dict with created file paths and status
+        dict with created file paths and status; files whose content (apart
+        from the generation timestamp) was already up to date are left
+        untouched and also listed under unchanged_files
+
+    MASTER.md is written once however many pages are given, and the pages'
+    override searches run together (see _page_searches).
     """
     base_dir = Path(output_dir) if output_dir else Path.cwd()
     
@@ -511,6 +624,7 @@ def persist_design_system(design_system: dict, page: str = None, output_dir: str
     pages_dir = design_system_dir / "pages"
     
     created_files = []
+    unchanged_files = []
     
     # Create directories
     design_system_dir.mkdir(parents=True, exist_ok=True)
@@ -520,22 +634,27 @@ def persist_design_system(design_system: dict, page: str = None, output_dir: str
     
     # Generate and write MASTER.md
     master_content = format_master_md(design_system)
-    with open(master_file, 'w', encoding='utf-8') as f:
-        f.write(master_content)
+    if not _write_if_changed(master_file, master_content):
+        unchanged_files.append(str(master_file))
     created_files.append(str(master_file))
     
-    # If page is specified, create page override file with intelligent content
-    if page:
-        page_file = pages_dir / f"{page.lower().replace(' ', '-')}.md"
-        page_content = format_page_override_md(design_system, page, page_query)
-        with open(page_file, 'w', encoding='utf-8') as f:
-            f.write(page_content)
+    # Create a page override file with intelligent content for each page specified
+    pages = {}  # page file -> page name; a repeated file keeps its first name
+    for name in ([page] if isinstance(page, str) else page or []):
+        if name:
+            pages.setdefault(pages_dir / f"{name.lower().replace(' ', '-')}.md", name)
+    searches = _page_searches(list(pages.values()), page_query)
+    for (page_file, name), page_search in zip(pages.items(), searches):
+        page_content = format_page_override_md(design_system, name, page_query, page_search)
+        if not _write_if_changed(page_file, page_content):
+            unchanged_files.append(str(page_file))
         created_files.append(str(page_file))
     
     return {
         "status": "success",
         "design_system_dir": str(design_system_dir),
-        "created_files": created_files
+        "created_files": created_files,
+        "unchanged_files": unchanged_files
     }
 
 
@@ -802,14 +921,18 @@ def format_master_md(design_system: dict) -> str:
     return "\n".join(lines)
 
 
-def format_page_override_md(design_system: dict, page_name: str, page_query: str = None) -> str:
-    """Format a page-specific override file with intelligent AI-generated content."""
+def format_page_override_md(design_system: dict, page_name: str, page_query: str = None,
+                            page_search: tuple = None) -> str:
+    """Format a page-specific override file with intelligent AI-generated content.
+
+    page_search: this page's entry from _page_searches(), if already run
+    """
     project = design_system.get("project_name", "PROJECT")
     timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     page_title = page_name.replace("-", " ").replace("_", " ").title()
     
     # Detect page type and generate intelligent overrides
-    page_overrides = _generate_intelligent_overrides(page_name, page_query, design_system)
+    page_overrides = _generate_intelligent_overrides(page_name, page_query, design_system, page_search)
     
     lines = []
     
@@ -911,23 +1034,41 @@ def format_page_override_md(design_system: dict, page_name: str, page_query: str
     return "\n".join(lines)
 
 
-def _generate_intelligent_overrides(page_name: str, page_query: str, design_system: dict) -> dict:
+# Page override searches: (domain, max_results) run for every page's context
+PAGE_SEARCHES = [("style", 1), ("ux", 3), ("landing", 1)]
+
+
+def _page_context(page_name: str, page_query: str) -> str:
+    return f"{page_name.lower()} {(page_query or '').lower()}"
+
+
+def _page_searches(page_names: list, page_query: str = None) -> list:
+    """(style, ux, landing) search responses for each page, from one search_many call.
+
+    All pages' contexts go to each domain in the same BM25.top_k_batch, so
+    the terms they share (the project query) are scored once per domain
+    rather than once per page (the NumPy backend precomputes every term's
+    weights anyway).
+    """
+    contexts = [_page_context(name, page_query) for name in page_names]
+    responses = search_many([(context, domain, max_results)
+                             for context in contexts for domain, max_results in PAGE_SEARCHES])
+    step = len(PAGE_SEARCHES)
+    return [tuple(responses[i:i + step]) for i in range(0, len(responses), step)]
+
+
+def _generate_intelligent_overrides(page_name: str, page_query: str, design_system: dict,
+                                    page_search: tuple = None) -> dict:
     """
     Generate intelligent overrides based on page type using layered search.
     
     Uses the existing search infrastructure to find relevant style, UX, and layout
     data instead of hardcoded page types.
     """
-    from core import search
-    
-    page_lower = page_name.lower()
-    query_lower = (page_query or "").lower()
-    combined_context = f"{page_lower} {query_lower}"
+    combined_context = _page_context(page_name, page_query)
     
     # Search across multiple domains for page-specific guidance
-    style_search = search(combined_context, "style", max_results=1)
-    ux_search = search(combined_context, "ux", max_results=3)
-    landing_search = search(combined_context, "landing", max_results=1)
+    style_search, ux_search, landing_search = page_search or _page_searches([page_name], page_query)[0]
     
     # Extract results from search response
     style_results = style_search.get("results", [])
@@ -1019,24 +1160,10 @@ def _generate_intelligent_overrides(page_name: str, page_query: str, design_syst
 
 def _detect_page_type(context: str, style_results: list) -> str:
     """Detect page type from context and search results."""
-    context_lower = context.lower()
-    
-    # Check for common page type patterns
-    page_patterns = [
-        (["dashboard", "admin", "analytics", "data", "metrics", "stats", "monitor", "overview"], "Dashboard / Data View"),
-        (["checkout", "payment", "cart", "purchase", "order", "billing"], "Checkout / Payment"),
-        (["settings", "profile", "account", "preferences", "config"], "Settings / Profile"),
-        (["landing", "marketing", "homepage", "hero", "home", "promo"], "Landing / Marketing"),
-        (["login", "signin", "signup", "register", "auth", "password"], "Authentication"),
-        (["pricing", "plans", "subscription", "tiers", "packages"], "Pricing / Plans"),
-        (["blog", "article", "post", "news", "content", "story"], "Blog / Article"),
-        (["product", "item", "detail", "pdp", "shop", "store"], "Product Detail"),
-        (["search", "results", "browse", "filter", "catalog", "list"], "Search Results"),
-        (["empty", "404", "error", "not found", "zero"], "Empty State"),
-    ]
-    
-    for keywords, page_type in page_patterns:
-        if any(kw in context_lower for kw in keywords):
+    # First page type (in PAGE_PATTERNS order) with a keyword in the context
+    scores = ROUTER.counts("page", context.lower())
+    for page_type, hits in scores.items():
+        if hits:
             return page_type
     
     # Fallback: try to infer from style results
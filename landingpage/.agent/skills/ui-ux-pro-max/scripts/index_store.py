@@ -0,0 +1,303 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+UI/UX Pro Max Index Store - prebuilt on-disk BM25 indexes
+
+Usage:
+    python search.py --build-index
+
+Every CSV in CSV_CONFIG / STACK_CONFIG (see core.iter_sources) gets an .idx file under index/ (next to
+data/) holding the fitted BM25 state, plus a .rows file holding the projected
+output rows, so a cold process can answer a query without parsing the CSV or
+refitting.
+
+File layout: INDEX_MAGIC, the length of the metadata block as a little-endian
+uint32, then two marshal blobs - a small metadata dict (format version, Python
+version, byte order, source size/mtime/SHA-256/CRC-32, columns) and the index body,
+whose BM25 arrays are stored as raw native-endian bytes. An index is
+only used while it matches its source CSV; anything stale, corrupt or from
+another format version is ignored and search falls back to the CSV. Sources
+with facet columns also store their facet index in the body.
+
+Row store layout: ROWS_MAGIC, the metadata length and blob as above (the
+same freshness fields plus the row layout), padding to 8 bytes, a table of
+native-endian uint64 block offsets, then the blocks. Each block is a marshal
+blob of value lists for block_rows consecutive rows, zlib-compressed when
+the rows are wide. The file is memory-mapped, so a search decodes only the
+blocks of the rows it returns and processes share the OS page cache.
+"""
+
+import marshal
+import os
+import struct
+import sys
+from array import array
+from pathlib import Path
+
+from core import DATA_DIR, _FacetIndex, _RowStore, _fit_csv, bm25_class, iter_sources
+
+# ============ CONFIGURATION ============
+INDEX_DIR = Path(__file__).parent.parent / "index"
+INDEX_MAGIC = b"UIPXIDX\0"
+INDEX_VERSION = 5
+ROWS_MAGIC = b"UIPXROW\0"
+ROWS_VERSION = 1
+COMPRESS_MIN_ROW_BYTES = 1024  # Average marshalled row size above which row blocks are compressed
+COMPRESS_BLOCK_ROWS = 16  # Rows per compressed block (uncompressed blocks hold one row)
+_META_LEN = struct.Struct("<I")
+
+
+def _checksums(filepath):
+    """(SHA-256 hex digest, CRC-32) of a file's contents, from one read.
+
+    The CRC-32 is core._file_digest's, so a loaded index can recognise
+    appends without reading the CSV again.
+    """
+    import hashlib  # only needed when the mtime check is inconclusive
+    import zlib
+
+    digest = hashlib.sha256()
+    crc = 0
+    with open(filepath, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 16), b""):
+            digest.update(block)
+            crc = zlib.crc32(block, crc)
+    return digest.hexdigest(), crc
+
+
+def index_path(filepath):
+    """Location of the prebuilt index for a CSV (mirrors its path under data/)"""
+    filepath = Path(filepath)
+    try:
+        relative = filepath.relative_to(DATA_DIR)
+    except ValueError:
+        relative = Path(filepath.name)
+    return INDEX_DIR / relative.with_suffix(".idx")
+
+
+def rows_path(filepath):
+    """Location of the prebuilt row store for a CSV (next to its index)"""
+    return index_path(filepath).with_suffix(".rows")
+
+
+# ============ ROW STORE ============
+class _MappedRows(_RowStore):
+    """Projected output rows read from a memory-mapped .rows file.
+
+    _read() decodes only the blocks holding the requested rows. tail holds
+    rows appended to the CSV since the store was built (see
+    core._append_index).
+    """
+
+    __slots__ = ("_mm", "_table", "_data", "columns", "count", "block_rows", "compressed", "tail")
+
+    def __init__(self, mm, meta, table_start, tail=()):
+        super().__init__()
+        self._mm = mm
+        self.columns = meta["columns"]
+        self.count = meta["count"]
+        self.block_rows = meta["block_rows"]
+        self.compressed = meta["compressed"]
+        n_blocks = -(-self.count // self.block_rows)
+        self._data = table_start + 8 * (n_blocks + 1)
+        # Validate before exporting a view: mm cannot be closed while one exists
+        if self._data > len(mm) or self._data + struct.unpack_from("=Q", mm, self._data - 8)[0] > len(mm):
+            raise ValueError("truncated row store")
+        self._table = memoryview(mm)[table_start:self._data].cast("Q")
+        self.tail = tail
+
+    def __len__(self):
+        return self.count + len(self.tail)
+
+    def extended(self, signature, rows):
+        """A row store sharing this mapping, with rows appended after the mapped ones"""
+        extended = _MappedRows.__new__(_MappedRows)
+        _RowStore.__init__(extended)
+        for name in self.__slots__:
+            setattr(extended, name, getattr(self, name))
+        extended.tail = self.tail + tuple(rows)
+        return extended
+
+    def _block(self, block):
+        blob = self._mm[self._data + self._table[block]:self._data + self._table[block + 1]]
+        if self.compressed:
+            import zlib
+            blob = zlib.decompress(blob)
+        return marshal.loads(blob)
+
+    def _read(self, ids):
+        blocks = {}
+        rows = {}
+        for idx in ids:
+            if idx >= self.count:
+                rows[idx] = self.tail[idx - self.count]
+                continue
+            block, pos = divmod(idx, self.block_rows)
+            if block not in blocks:
+                blocks[block] = self._block(block)
+            rows[idx] = dict(zip(self.columns, blocks[block][pos]))
+        return rows
+
+
+def _write_rows(target, meta, rows, compress=None):
+    """Write a row store; compress=None compresses when rows are wide on average"""
+    columns = list(rows[0]) if rows else []
+    values = [[row[col] for col in columns] for row in rows]
+    if compress is None:
+        compress = bool(values) and len(marshal.dumps(values)) / len(values) > COMPRESS_MIN_ROW_BYTES
+    block_rows = COMPRESS_BLOCK_ROWS if compress else 1
+
+    blocks = []
+    for start in range(0, len(values), block_rows):
+        blob = marshal.dumps(values[start:start + block_rows])
+        if compress:
+            import zlib
+            blob = zlib.compress(blob, 6)
+        blocks.append(blob)
+    table = array("Q", [0])
+    for blob in blocks:
+        table.append(table[-1] + len(blob))
+
+    meta = dict(meta, rows_version=ROWS_VERSION, columns=columns, count=len(rows),
+                block_rows=block_rows, compressed=compress)
+    meta_blob = marshal.dumps(meta)
+    header = len(ROWS_MAGIC) + _META_LEN.size + len(meta_blob)
+    tmp = target.with_name(target.name + ".tmp")
+    with open(tmp, 'wb') as f:
+        f.write(ROWS_MAGIC)
+        f.write(_META_LEN.pack(len(meta_blob)))
+        f.write(meta_blob)
+        f.write(b"\0" * (-header % 8))  # keep the offset table 8-byte aligned
+        f.write(table.tobytes())
+        for blob in blocks:
+            f.write(blob)
+    os.replace(tmp, target)
+
+
+def load_rows(filepath, search_cols, output_cols, options=None):
+    """Memory-map the fresh prebuilt row store for filepath, or None"""
+    import mmap
+
+    try:
+        with open(rows_path(filepath), 'rb') as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+    try:
+        if mm[:len(ROWS_MAGIC)] != ROWS_MAGIC:
+            raise ValueError("not a row store")
+        start = len(ROWS_MAGIC) + _META_LEN.size
+        (meta_len,) = _META_LEN.unpack_from(mm, len(ROWS_MAGIC))
+        meta = marshal.loads(mm[start:start + meta_len])
+        if (not isinstance(meta, dict) or meta.get("rows_version") != ROWS_VERSION
+                or not _is_fresh(meta, filepath, search_cols, output_cols, options)):
+            raise ValueError("stale row store")
+        header = start + meta_len
+        return _MappedRows(mm, meta, header + (-header % 8))
+    except (OSError, EOFError, ValueError, TypeError, KeyError, BufferError, struct.error):
+        mm.close()
+        return None
+
+
+# ============ READ / WRITE ============
+def _options_meta(options):
+    """Plain-data form of a core.SourceOptions for the metadata block"""
+    return None if options is None else [list(options.facet_cols), [list(item) for item in options.separators],
+                                         options.null_value]
+
+
+def save_index(filepath, search_cols, output_cols, compress=None, options=None):
+    """Fit filepath and write its prebuilt index and row store. Returns (index_path, row_count).
+
+    compress forces row-block compression on or off (default: only for wide rows).
+    """
+    filepath = Path(filepath)
+    stat = filepath.stat()
+    rows, bm25, facets = _fit_csv(filepath, search_cols, output_cols, options)
+    sha256, crc32 = _checksums(filepath)
+
+    meta = {
+        "version": INDEX_VERSION,
+        "python": tuple(sys.version_info[:2]),
+        "byteorder": sys.byteorder,
+        "source_size": stat.st_size,
+        "source_mtime_ns": stat.st_mtime_ns,
+        "source_sha256": sha256,
+        "source_crc32": crc32,
+        "search_cols": list(search_cols),
+        "output_cols": list(output_cols),
+        "options": _options_meta(options)
+    }
+    body = {"bm25": bm25.to_state()}
+    if facets is not None:
+        body["facets"] = facets.to_state()
+
+    target = index_path(filepath)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    _write_rows(rows_path(filepath), meta, rows, compress)
+    tmp = target.with_name(target.name + ".tmp")
+    meta_blob = marshal.dumps(meta)
+    with open(tmp, 'wb') as f:
+        f.write(INDEX_MAGIC)
+        f.write(_META_LEN.pack(len(meta_blob)))
+        f.write(meta_blob)
+        f.write(marshal.dumps(body))
+    os.replace(tmp, target)
+    return target, len(rows)
+
+
+def _is_fresh(meta, filepath, search_cols, output_cols, options=None):
+    """Check a prebuilt index header against the current source CSV"""
+    if meta.get("version") != INDEX_VERSION or meta.get("python") != tuple(sys.version_info[:2]):
+        return False
+    if meta.get("byteorder") != sys.byteorder:
+        return False
+    if meta.get("search_cols") != list(search_cols) or meta.get("output_cols") != list(output_cols):
+        return False
+    if meta.get("options") != _options_meta(options):
+        return False
+    stat = filepath.stat()
+    if meta.get("source_size") != stat.st_size:
+        return False
+    if meta.get("source_mtime_ns") == stat.st_mtime_ns:
+        return True
+    # Same size, different mtime (e.g. after a fresh checkout): trust the content
+    return meta.get("source_sha256") == _checksums(filepath)[0]
+
+
+def load_index(filepath, search_cols, output_cols, options=None):
+    """Return (row store, bm25, facets, CRC-32 of the source) from a fresh prebuilt index, or None to use the CSV"""
+    filepath = Path(filepath)
+    target = index_path(filepath)
+    try:
+        with open(target, 'rb') as f:
+            blob = f.read()
+        if not blob.startswith(INDEX_MAGIC):
+            return None
+        # marshal.loads on an in-memory buffer is several times faster than marshal.load(f)
+        view = memoryview(blob)
+        start = len(INDEX_MAGIC) + _META_LEN.size
+        (meta_len,) = _META_LEN.unpack_from(view, len(INDEX_MAGIC))
+        meta = marshal.loads(view[start:start + meta_len])
+        if not isinstance(meta, dict) or not _is_fresh(meta, filepath, search_cols, output_cols, options):
+            return None
+        body = marshal.loads(view[start + meta_len:])
+        rows = load_rows(filepath, search_cols, output_cols, options)
+        if rows is None:
+            return None
+        state = body["bm25"]
+        facets = _FacetIndex.from_state(body["facets"]) if "facets" in body else None
+        return rows, bm25_class(state["N"]).from_state(state), facets, meta["source_crc32"]
+    except (OSError, EOFError, ValueError, TypeError, KeyError, BufferError, struct.error):
+        return None
+
+
+def build_indexes():
+    """Prebuild every configured domain and stack. Returns [(name, index_path, rows)]."""
+    built = []
+    for name, filepath, search_cols, output_cols, options in iter_sources():
+        if not filepath.exists():
+            continue
+        target, count = save_index(filepath, search_cols, output_cols, options=options)
+        built.append((name, target, count))
+    return built
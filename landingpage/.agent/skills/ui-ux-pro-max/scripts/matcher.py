@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+UI/UX Pro Max Matcher - compiled substring matchers for keyword routing
+
+Automaton is an Aho-Corasick automaton: built once from a set of patterns,
+it reports every pattern occurring in a text (overlapping ones included)
+in a single pass over the text, however many patterns there are.
+
+RuleMatcher compiles the names of an ordered rule list (ui-reasoning.csv's
+UI_Category) for design_system's reasoning lookup.
+"""
+
+from bisect import bisect_right
+
+
+# ============ AHO-CORASICK ============
+class Automaton:
+    """Aho-Corasick automaton over a fixed set of patterns"""
+
+    __slots__ = ("_goto", "_fail", "_out", "_empty")
+
+    def __init__(self, patterns):
+        goto = [{}]
+        out = [()]
+        self._empty = False
+        for pattern in dict.fromkeys(patterns):
+            if not pattern:
+                self._empty = True  # occurs in every text
+                continue
+            node = 0
+            for ch in pattern:
+                nxt = goto[node].get(ch)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto[node][ch] = nxt
+                    goto.append({})
+                    out.append(())
+                node = nxt
+            out[node] += (pattern,)
+
+        # Breadth-first: a state's failure link is the longest proper suffix
+        # of its path that is also a path, and it inherits that state's outputs
+        fail = [0] * len(goto)
+        queue = list(goto[0].values())
+        for node in queue:
+            for ch, nxt in goto[node].items():
+                state = fail[node]
+                while state and ch not in goto[state]:
+                    state = fail[state]
+                fail[nxt] = goto[state].get(ch, 0)
+                out[nxt] += out[fail[nxt]]
+                queue.append(nxt)
+        self._goto = goto
+        self._fail = fail
+        self._out = out
+
+    def find(self, text):
+        """Set of the patterns occurring in text"""
+        goto, fail, out = self._goto, self._fail, self._out
+        found = {""} if self._empty else set()
+        node = 0
+        for ch in text:
+            while True:
+                nxt = goto[node].get(ch)
+                if nxt is not None:
+                    node = nxt
+                    break
+                if not node:
+                    break
+                node = fail[node]
+            if out[node]:
+                found.update(out[node])
+        return found
+
+
+# ============ RULE NAMES ============
+class RuleMatcher:
+    """First rule whose name matches a category, in three tiers.
+
+    For a lowercased category c and lowercased rule names, in priority order:
+    the first rule named exactly c; else the first rule whose name occurs in
+    c or contains c; else the first rule with a name keyword (split on
+    spaces, "/" and "-") occurring in c. Names occurring in c and keywords
+    come from one Automaton pass over c; names containing c from one
+    str.find over all names joined by NUL, whose first hit is the earliest
+    such rule.
+    """
+
+    __slots__ = ("_exact", "_names", "_keywords", "_empty", "_automaton", "_joined", "_starts")
+
+    def __init__(self, names):
+        self._exact = {}
+        self._names = {}  # non-empty name -> first rule index
+        self._keywords = {}  # keyword -> first rule index
+        self._empty = None  # first rule with an empty name: it occurs in every category
+        self._starts = []
+        for idx, name in enumerate(names):
+            name = (name or "").lower()
+            self._exact.setdefault(name, idx)
+            if name:
+                self._names.setdefault(name, idx)
+            elif self._empty is None:
+                self._empty = idx
+            for keyword in name.replace("/", " ").replace("-", " ").split():
+                self._keywords.setdefault(keyword, idx)
+        self._automaton = Automaton(list(self._names) + list(self._keywords))
+
+        offset = 0
+        for name in names:
+            self._starts.append(offset)
+            offset += len((name or "").lower()) + 1
+        self._joined = "\0".join((name or "").lower() for name in names)
+
+    def match(self, category):
+        """Index of the matching rule, or None"""
+        category = category.lower()
+        idx = self._exact.get(category)
+        if idx is not None:
+            return idx
+
+        found = self._automaton.find(category)
+        candidates = [self._names[name] for name in found if name in self._names]
+        if self._empty is not None:
+            candidates.append(self._empty)
+        if self._starts and "\0" not in category:
+            pos = self._joined.find(category)
+            if pos >= 0:
+                candidates.append(bisect_right(self._starts, pos) - 1)
+        if candidates:
+            return min(candidates)
+
+        candidates = [self._keywords[keyword] for keyword in found if keyword in self._keywords]
+        return min(candidates) if candidates else None
+
+
+# ============ KEYWORD ROUTING ============
+class KeywordClassifier:
+    """Per-class keyword hit counts for several keyword tables, from one shared Automaton.
+
+    A table is an ordered list of (label, keywords). counts() gives, for
+    every class of one table, how many of its keywords occur in the text -
+    what `sum(kw in text for kw in keywords)` gives - from a single pass.
+    Adding a table recompiles the automaton on next use.
+    """
+
+    def __init__(self):
+        import threading
+
+        self._tables = {}
+        self._compiled = None  # (Automaton, {pattern: [(table, class position)]})
+        self._lock = threading.Lock()
+
+    def add_table(self, name, classes):
+        """Register (or replace) table name: [(label, keywords)] in priority order"""
+        with self._lock:
+            self._tables[name] = [(label, tuple(keywords)) for label, keywords in classes]
+            self._compiled = None
+
+    def _compile(self):
+        with self._lock:
+            if self._compiled is None:
+                index = {}
+                for name, classes in self._tables.items():
+                    for pos, (_, keywords) in enumerate(classes):
+                        for keyword in keywords:
+                            index.setdefault(keyword, []).append((name, pos))
+                self._compiled = (Automaton(index), index)
+            return self._compiled
+
+    def counts(self, name, text):
+        """{label: keyword hits in text} for table name, in table order"""
+        automaton, index = self._compiled or self._compile()
+        classes = self._tables[name]
+        hits = [0] * len(classes)
+        for pattern in automaton.find(text):
+            for table, pos in index[pattern]:
+                if table == name:
+                    hits[pos] += 1
+        return {label: count for (label, _), count in zip(classes, hits)}
+
+
+ROUTER = KeywordClassifier()  # shared by core.detect_domain and design_system._detect_page_type
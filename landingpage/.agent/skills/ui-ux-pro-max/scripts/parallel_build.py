@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+UI/UX Pro Max Parallel Build - sharded BM25 fitting for very large CSVs
+
+Used by core._build_index for CSVs of at least PARALLEL_MIN_BYTES when more
+than one worker is available (UIPRO_BUILD_WORKERS, default: CPU count).
+
+The file is cut into byte ranges that start on record boundaries: a newline
+ends a record when the number of quote characters before it is even, so
+quoted fields spanning several lines are never split. Worker processes parse
+their range with core's streaming scanner and tokenize and count terms
+(core.count_terms); BM25.fit_counts then merges the shards into global
+document frequencies, postings and length norms, and facet postings are
+concatenated in shard order. The result is identical to
+a single-process fit.
+
+Workers are started from a fork server (spawned where there is none), never
+forked from the building process: builds run on daemon and async API
+threads, and a child forked while another thread holds a lock (the import
+lock, a logging or allocator lock) can deadlock.
+"""
+
+import io
+import os
+from array import array
+
+from core import _CsvRows, _CsvScanner, _IndexEntry, _UnsupportedCsv, _scan_csv, bm25_class, count_terms
+
+# ============ CONFIGURATION ============
+CHUNKS_PER_WORKER = 4  # more, smaller shards even out uneven row widths
+_BLOCK = 1 << 20
+
+
+# ============ CHUNKING ============
+def chunk_bounds(filepath, start, n_chunks):
+    """Split filepath from byte start (a record boundary) into up to n_chunks record-aligned ranges.
+
+    Returns ([(start, end)], CRC-32 of the whole file).
+    """
+    import zlib
+
+    size = os.path.getsize(filepath)
+    targets = [start + (size - start) * i // n_chunks for i in range(1, n_chunks)]
+    cuts = [start]
+    crc = 0
+    quotes = 0  # quote characters before the current block
+    pos = 0
+    with open(filepath, 'rb') as f:
+        for block in iter(lambda: f.read(_BLOCK), b""):
+            crc = zlib.crc32(block, crc)
+            end = pos + len(block)
+            i = 0
+            seen = quotes  # quote characters before block[i]
+            while targets and targets[0] < end:
+                newline = block.find(b"\n", max(targets[0] - pos, i))
+                if newline < 0:
+                    break  # the next newline is in a later block
+                seen += block.count(b'"', i, newline)
+                i = newline + 1
+                if seen % 2:
+                    continue  # inside a quoted field: try the next newline
+                cuts.append(pos + i)
+                while targets and targets[0] < pos + i:
+                    targets.pop(0)
+            quotes += block.count(b'"')
+            pos = end
+    if cuts[-1] < size:
+        cuts.append(size)
+    return list(zip(cuts, cuts[1:])), crc
+
+
+def _count_chunk(filepath, start, end, fieldnames, search_cols, options=None):
+    """Worker: record offsets, term counts and facet postings for the records in [start, end)"""
+    with open(filepath, 'rb') as f:
+        f.seek(start)
+        data = f.read(end - start)
+    documents, offsets, facets = _scan_csv(_CsvScanner(io.BytesIO(data)), fieldnames, search_cols, options)
+    doc_lengths, terms, term_offsets, doc_ids, tfs = count_terms(documents)
+    # Arrays pickle as raw bytes, much faster than lists of ints
+    counts = (doc_lengths, terms, term_offsets, doc_ids, array('I', tfs))
+    return array('Q', [offset + start for offset in offsets]), counts, facets
+
+
+# ============ BUILD ============
+def _pool_context():
+    """Start method for worker processes: forkserver, else spawn; never a fork of this threaded process"""
+    import multiprocessing
+
+    method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+    return multiprocessing.get_context(method)
+
+
+def build_sharded(filepath, search_cols, output_cols, signature, workers, options=None):
+    """Fit filepath across worker processes; returns an _IndexEntry, or None if the CSV needs the eager loader"""
+    from concurrent.futures import ProcessPoolExecutor
+    from concurrent.futures.process import BrokenProcessPool
+
+    with open(filepath, 'rb') as f:
+        scanner = _CsvScanner(f)
+        try:
+            fieldnames = scanner.header() or []
+        except _UnsupportedCsv:
+            return None
+        header_end = scanner.pos
+    bounds, digest = chunk_bounds(filepath, header_end, workers * CHUNKS_PER_WORKER)
+
+    try:
+        with ProcessPoolExecutor(workers, mp_context=_pool_context()) as pool:
+            futures = [pool.submit(_count_chunk, str(filepath), start, end, fieldnames, list(search_cols), options)
+                       for start, end in bounds]
+            shards = [future.result() for future in futures]
+    except (_UnsupportedCsv, BrokenProcessPool, OSError):
+        # Bare CR line breaks, or no worker processes here (e.g. workers
+        # re-importing an unguarded __main__): build in this process
+        return None
+
+    offsets = array('Q')
+    facets = None
+    for chunk_offsets, _, chunk_facets in shards:
+        offsets.extend(chunk_offsets)
+        if facets is None:
+            facets = chunk_facets
+        elif chunk_facets is not None:
+            facets.extend(chunk_facets)
+    bm25 = bm25_class(len(offsets))()
+    bm25.fit_counts([counts for _, counts, _ in shards])
+    null = options.null_value if options else None
+    rows = _CsvRows(filepath, signature, fieldnames, list(output_cols), offsets, null)
+    return _IndexEntry(signature, rows, bm25, digest, facets and facets.compact())
@@ -1,106 +1,218 @@
-#!/usr/bin/env python3
-# -*- coding: utf-8 -*-
-"""
-UI/UX Pro Max Search - BM25 search engine for UI/UX style guides
-Usage: python search.py "<query>" [--domain <domain>] [--stack <stack>] [--max-results 3]
-       python search.py "<query>" --design-system [-p "Project Name"]
-       python search.py "<query>" --design-system --persist [-p "Project Name"] [--page "dashboard"]
-
-Domains: style, prompt, color, chart, landing, product, ux, typography
-Stacks: html-tailwind, react, nextjs
-
-Persistence (Master + Overrides pattern):
-  --persist    Save design system to design-system/MASTER.md
-  --page       Also create a page-specific override file in design-system/pages/
-"""
-
-import argparse
-from core import CSV_CONFIG, AVAILABLE_STACKS, MAX_RESULTS, search, search_stack
-from design_system import generate_design_system, persist_design_system
-
-
-def format_output(result):
-    """Format results for Claude consumption (token-optimized)"""
-    if "error" in result:
-        return f"Error: {result['error']}"
-
-    output = []
-    if result.get("stack"):
-        output.append(f"## UI Pro Max Stack Guidelines")
-        output.append(f"**Stack:** {result['stack']} | **Query:** {result['query']}")
-    else:
-        output.append(f"## UI Pro Max Search Results")
-        output.append(f"**Domain:** {result['domain']} | **Query:** {result['query']}")
-    output.append(f"**Source:** {result['file']} | **Found:** {result['count']} results\n")
-
-    for i, row in enumerate(result['results'], 1):
-        output.append(f"### Result {i}")
-        for key, value in row.items():
-            value_str = str(value)
-            if len(value_str) > 300:
-                value_str = value_str[:300] + "..."
-            output.append(f"- **{key}:** {value_str}")
-        output.append("")
-
-    return "\n".join(output)
-
-
-if __name__ == "__main__":
-    parser = argparse.ArgumentParser(description="UI Pro Max Search")
-    parser.add_argument("query", help="Search query")
-    parser.add_argument("--domain", "-d", choices=list(CSV_CONFIG.keys()), help="Search domain")
-    parser.add_argument("--stack", "-s", choices=AVAILABLE_STACKS, help="Stack-specific search (html-tailwind, react, nextjs)")
-    parser.add_argument("--max-results", "-n", type=int, default=MAX_RESULTS, help="Max results (default: 3)")
-    parser.add_argument("--json", action="store_true", help="Output as JSON")
-    # Design system generation
-    parser.add_argument("--design-system", "-ds", action="store_true", help="Generate complete design system recommendation")
-    parser.add_argument("--project-name", "-p", type=str, default=None, help="Project name for design system output")
-    parser.add_argument("--format", "-f", choices=["ascii", "markdown"], default="ascii", help="Output format for design system")
-    # Persistence (Master + Overrides pattern)
-    parser.add_argument("--persist", action="store_true", help="Save design system to design-system/MASTER.md (creates hierarchical structure)")
-    parser.add_argument("--page", type=str, default=None, help="Create page-specific override file in design-system/pages/")
-    parser.add_argument("--output-dir", "-o", type=str, default=None, help="Output directory for persisted files (default: current directory)")
-
-    args = parser.parse_args()
-
-    # Design system takes priority
-    if args.design_system:
-        result = generate_design_system(
-            args.query, 
-            args.project_name, 
-            args.format,
-            persist=args.persist,
-            page=args.page,
-            output_dir=args.output_dir
-        )
-        print(result)
-        
-        # Print persistence confirmation
-        if args.persist:
-            project_slug = args.project_name.lower().replace(' ', '-') if args.project_name else "default"
-            print("\n" + "=" * 60)
-            print(f"✅ Design system persisted to design-system/{project_slug}/")
-            print(f"   📄 design-system/{project_slug}/MASTER.md (Global Source of Truth)")
-            if args.page:
-                page_filename = args.page.lower().replace(' ', '-')
-                print(f"   📄 design-system/{project_slug}/pages/{page_filename}.md (Page Overrides)")
-            print("")
-            print(f"📖 Usage: When building a page, check design-system/{project_slug}/pages/[page].md first.")
-            print(f"   If exists, its rules override MASTER.md. Otherwise, use MASTER.md.")
-            print("=" * 60)
-    # Stack search
-    elif args.stack:
-        result = search_stack(args.query, args.stack, args.max_results)
-        if args.json:
-            import json
-            print(json.dumps(result, indent=2, ensure_ascii=False))
-        else:
-            print(format_output(result))
-    # Domain search
-    else:
-        result = search(args.query, args.domain, args.max_results)
-        if args.json:
-            import json
-            print(json.dumps(result, indent=2, ensure_ascii=False))
-        else:
-            print(format_output(result))
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+UI/UX Pro Max Search - BM25 search engine for UI/UX style guides
+Usage: python search.py "<query>" [--domain <domain>] [--stack <stack>] [--max-results 3]
+       python search.py "<query>" --domain ux --filter Severity=High [--filter Platform=Web]
+       python search.py "<query>" --design-system [-p "Project Name"]
+       python search.py "<query>" --design-system --persist [-p "Project Name"] [--page "dashboard" --page "checkout"]
+       python search.py --batch projects.jsonl [--workers 4] [--persist] [-o out/]
+       python search.py --build-index
+       python search.py --serve [--socket /tmp/uipro.sock]
+
+Domains: style, prompt, color, chart, landing, product, ux, typography
+         all (every domain and stack in one cross-domain pass)
+Stacks: html-tailwind, react, nextjs
+
+Persistence (Master + Overrides pattern):
+  --persist    Save design system to design-system/MASTER.md
+  --page       Also create a page-specific override file in design-system/pages/
+               (repeatable: every page's overrides are generated in one pass)
+
+Filters (--filter COL=VALUE, repeatable):
+  Restrict a domain or stack search to rows whose column equals VALUE (case-insensitive)
+  before ranking. Repeating a column matches any of its values; different columns must
+  all match. Filterable: ux/react/web - Category, Platform, Severity; stacks - Category,
+  Severity; company - cnae_principal, cnae_secundaria, uf, municipio, situacao_cadastral
+
+Batch mode (see batch.py):
+  --batch      Generate design systems for every project in a JSONL/CSV file ("-": stdin)
+               across --workers processes, streaming one JSON line per project
+
+Prebuilt indexes:
+  --build-index  Write index/*.idx so later searches skip CSV parsing and BM25 fitting
+
+Daemon mode (see server.py):
+  --serve      Keep indexes warm and answer JSON-lines requests on stdin/stdout or --socket
+  --socket     Unix socket of a running daemon (default: $UIPRO_SEARCH_SOCKET); queries are
+               sent there and run in-process when no daemon is listening
+"""
+
+import argparse
+import os
+from core import CSV_CONFIG, AVAILABLE_STACKS, MAX_RESULTS
+
+# Each mode below imports only what it needs: per-invocation latency is
+# dominated by interpreter start-up and imports (see check_startup.py).
+
+
+def format_output(result):
+    """Format results for Claude consumption (token-optimized)"""
+    if "error" in result:
+        return f"Error: {result['error']}"
+
+    output = []
+    if result.get("domain") == "all":
+        output.append(f"## UI Pro Max Cross-Domain Results")
+        output.append(f"**Query:** {result['query']} | **Domains matched:** {', '.join(result['by_domain']) or 'none'}")
+        output.append(f"**Found:** {result['count']} results\n")
+    elif result.get("stack"):
+        output.append(f"## UI Pro Max Stack Guidelines")
+        output.append(f"**Stack:** {result['stack']} | **Query:** {result['query']}")
+    else:
+        output.append(f"## UI Pro Max Search Results")
+        output.append(f"**Domain:** {result['domain']} | **Query:** {result['query']}")
+    if result.get("domain") != "all":
+        if result.get("filters"):
+            applied = "; ".join(f"{col} = {' | '.join(values)}" for col, values in result["filters"].items())
+            output.append(f"**Filters:** {applied}")
+        output.append(f"**Source:** {result['file']} | **Found:** {result['count']} results\n")
+
+    for i, row in enumerate(result['results'], 1):
+        output.append(f"### Result {i}")
+        for key, value in row.items():
+            value_str = str(value)
+            if len(value_str) > 300:
+                value_str = value_str[:300] + "..."
+            output.append(f"- **{key}:** {value_str}")
+        output.append("")
+
+    return "\n".join(output)
+
+
+def _parse_filters(specs):
+    """Turn repeated COL=VALUE options into {column: [values]}; None when none were given"""
+    if not specs:
+        return None
+    filters = {}
+    for spec in specs:
+        col, sep, value = spec.partition("=")
+        if not sep or not col.strip():
+            raise ValueError(f"--filter expects COL=VALUE, got {spec!r}")
+        filters.setdefault(col.strip(), []).append(value.strip())
+    return filters
+
+
+def _remote(socket_path, payload):
+    """Send payload to the daemon on socket_path; None means run in-process"""
+    if not socket_path:
+        return None
+    from server import request
+    return request(payload, socket_path)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="UI Pro Max Search")
+    parser.add_argument("query", nargs="?", help="Search query")
+    parser.add_argument("--domain", "-d", choices=list(CSV_CONFIG.keys()) + ["all"], help="Search domain ('all' searches every domain and stack at once)")
+    parser.add_argument("--stack", "-s", choices=AVAILABLE_STACKS, help="Stack-specific search (html-tailwind, react, nextjs)")
+    parser.add_argument("--max-results", "-n", type=int, default=MAX_RESULTS, help="Max results (default: 3)")
+    parser.add_argument("--json", action="store_true", help="Output as JSON")
+    parser.add_argument("--filter", action="append", metavar="COL=VALUE", help="Only rows whose COL equals VALUE (repeatable; see above)")
+    # Design system generation
+    parser.add_argument("--design-system", "-ds", action="store_true", help="Generate complete design system recommendation")
+    parser.add_argument("--project-name", "-p", type=str, default=None, help="Project name for design system output")
+    parser.add_argument("--format", "-f", choices=["ascii", "markdown"], default="ascii", help="Output format for design system")
+    # Persistence (Master + Overrides pattern)
+    parser.add_argument("--persist", action="store_true", help="Save design system to design-system/MASTER.md (creates hierarchical structure)")
+    parser.add_argument("--page", action="append", help="Create page-specific override file in design-system/pages/ (repeatable)")
+    parser.add_argument("--output-dir", "-o", type=str, default=None, help="Output directory for persisted files (default: current directory)")
+    # Batch generation
+    parser.add_argument("--batch", type=str, default=None, metavar="FILE", help="Generate design systems for every project in a JSONL/CSV file ('-' for stdin)")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes for --batch (default: $UIPRO_BATCH_WORKERS or CPU count)")
+    # Prebuilt indexes
+    parser.add_argument("--build-index", action="store_true", help="Prebuild on-disk indexes for every domain and stack, then exit")
+    # Daemon mode
+    parser.add_argument("--serve", action="store_true", help="Run as a daemon answering JSON-lines requests (stdin/stdout, or --socket)")
+    parser.add_argument("--socket", type=str, default=os.environ.get("UIPRO_SEARCH_SOCKET"), help="Unix socket of the search daemon (default: $UIPRO_SEARCH_SOCKET)")
+
+    args = parser.parse_args()
+    try:
+        filters = _parse_filters(args.filter)
+    except ValueError as exc:
+        parser.error(str(exc))
+    if filters and (args.design_system or args.domain == "all"):
+        parser.error("--filter needs a single --domain or --stack search")
+
+    if args.build_index:
+        from index_store import build_indexes
+        for name, path, count in build_indexes():
+            print(f"{name}: {count} rows -> {path}")
+    elif args.serve:
+        from server import serve
+        try:
+            serve(args.socket)
+        except OSError as exc:
+            parser.error(str(exc))
+    elif args.batch:
+        import sys
+        from batch import BATCH_WORKERS, main as run_batch
+        failed = run_batch(args.batch, args.workers or BATCH_WORKERS, args.format, args.persist, args.output_dir)
+        sys.exit(1 if failed else 0)
+    elif args.query is None:
+        parser.error("the following arguments are required: query")
+    # Design system takes priority
+    elif args.design_system:
+        response = _remote(args.socket, {
+            "op": "design_system",
+            "query": args.query,
+            "project_name": args.project_name,
+            "format": args.format,
+            "persist": args.persist,
+            "page": args.page,
+            # The daemon has its own working directory
+            "output_dir": os.path.abspath(args.output_dir or os.getcwd())
+        })
+        if response and "output" in response:
+            result = response["output"]
+        else:
+            from design_system import generate_design_system
+            result = generate_design_system(
+                args.query, 
+                args.project_name, 
+                args.format,
+                persist=args.persist,
+                page=args.page,
+                output_dir=args.output_dir
+            )
+        print(result)
+        
+        # Print persistence confirmation
+        if args.persist:
+            project_slug = args.project_name.lower().replace(' ', '-') if args.project_name else "default"
+            print("\n" + "=" * 60)
+            print(f"✅ Design system persisted to design-system/{project_slug}/")
+            print(f"   📄 design-system/{project_slug}/MASTER.md (Global Source of Truth)")
+            for page_filename in dict.fromkeys(page.lower().replace(' ', '-') for page in args.page or [] if page):
+                print(f"   📄 design-system/{project_slug}/pages/{page_filename}.md (Page Overrides)")
+            print("")
+            print(f"📖 Usage: When building a page, check design-system/{project_slug}/pages/[page].md first.")
+            print(f"   If exists, its rules override MASTER.md. Otherwise, use MASTER.md.")
+            print("=" * 60)
+    # Stack search
+    elif args.stack:
+        result = _remote(args.socket, {"op": "search_stack", "query": args.query, "stack": args.stack,
+                                       "max_results": args.max_results, "filters": filters})
+        if result is None:
+            from core import search_stack
+            result = search_stack(args.query, args.stack, args.max_results, filters)
+        if args.json:
+            import json
+            print(json.dumps(result, indent=2, ensure_ascii=False))
+        else:
+            print(format_output(result))
+    # Domain search
+    else:
+        result = _remote(args.socket, {"op": "search", "query": args.query, "domain": args.domain,
+                                       "max_results": args.max_results, "filters": filters})
+        if result is None and args.domain == "all":
+            from core import search_all
+            result = search_all(args.query, args.max_results)
+        elif result is None:
+            from core import search
+            result = search(args.query, args.domain, args.max_results, filters)
+        if args.json:
+            import json
+            print(json.dumps(result, indent=2, ensure_ascii=False))
+        else:
+            print(format_output(result))
@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+UI/UX Pro Max Search Daemon - answer JSON-lines requests from warm indexes
+
+Usage: python search.py --serve                      (JSON lines on stdin/stdout)
+       python search.py --serve --socket /tmp/uipro.sock
+       python search.py "<query>" --socket /tmp/uipro.sock   (thin client)
+
+Each request is one JSON object per line; each response is one line:
+  {"op": "search", "query": "...", "domain": "style", "max_results": 3}
+  {"op": "search", "query": "...", "domain": "ux", "filters": {"Severity": "High"}}
+  {"op": "search_stack", "query": "...", "stack": "react", "max_results": 3, "filters": {...}}
+  {"op": "design_system", "query": "...", "project_name": "...", "format": "ascii",
+   "persist": false, "page": null, "output_dir": "/abs/path"}
+  {"op": "ping"}
+  {"op": "stats"}   (index and result cache counters, for monitoring)
+search/search_stack responses have the same shape as `search.py --json`;
+design_system responses carry the formatted text under "output" (its "page"
+may be one page name or a list of them). An "id"
+field, if present, is echoed back. Failures are reported as {"error": ...}.
+"""
+
+import json
+import os
+import sys
+
+from core import iter_sources, _INDEXES
+
+# ============ CONFIGURATION ============
+DEFAULT_SOCKET = os.environ.get("UIPRO_SEARCH_SOCKET")
+CLIENT_TIMEOUT = 30.0  # seconds to wait for a daemon response
+
+
+def warm_indexes():
+    """Load every domain and stack index into the process-wide cache"""
+    for _, filepath, search_cols, output_cols, options in iter_sources():
+        if filepath.exists():
+            _INDEXES.get(filepath, search_cols, output_cols, options)
+
+
+def handle_request(request):
+    """Dispatch one request dict to the search engine and return the response dict"""
+    from core import MAX_RESULTS
+
+    op = request.get("op", "search")
+    query = request.get("query")
+    max_results = request.get("max_results", MAX_RESULTS)
+    try:
+        if op == "ping":
+            response = {"ok": True}
+        elif op == "stats":
+            from core import index_cache_info, result_cache_info
+            response = {"index_cache": index_cache_info(), "result_cache": result_cache_info()}
+        elif query is None:
+            response = {"error": "Missing 'query'"}
+        elif op == "search":
+            from core import search, search_all
+            if request.get("domain") == "all":
+                response = search_all(query, max_results)
+            else:
+                response = search(query, request.get("domain"), max_results, request.get("filters"))
+        elif op == "search_stack":
+            from core import search_stack
+            response = search_stack(query, request.get("stack"), max_results, request.get("filters"))
+        elif op == "design_system":
+            from design_system import generate_design_system
+            output = generate_design_system(
+                query,
+                request.get("project_name"),
+                request.get("format", "ascii"),
+                persist=request.get("persist", False),
+                page=request.get("page"),
+                output_dir=request.get("output_dir")
+            )
+            response = {"output": output}
+        else:
+            response = {"error": f"Unknown op: {op}"}
+    except Exception as exc:  # a bad request must not take the daemon down
+        response = {"error": f"{type(exc).__name__}: {exc}"}
+
+    if "id" in request:
+        response = {"id": request["id"], **response}
+    return response
+
+
+def _handle_line(line):
+    """Decode one JSON line, handle it and encode the response line"""
+    try:
+        request = json.loads(line)
+        if not isinstance(request, dict):
+            raise ValueError("request must be a JSON object")
+    except ValueError as exc:
+        response = {"error": f"Invalid request: {exc}"}
+    else:
+        response = handle_request(request)
+    return json.dumps(response, ensure_ascii=False) + "\n"
+
+
+# ============ SERVERS ============
+def serve_stdio(stdin=None, stdout=None):
+    """Answer JSON-lines requests from stdin until EOF"""
+    stdin = stdin or sys.stdin
+    stdout = stdout or sys.stdout
+    for line in stdin:
+        if line.strip():
+            stdout.write(_handle_line(line))
+            stdout.flush()
+
+
+def _listening(path):
+    """True if a daemon accepts connections on the Unix socket at path"""
+    import socket
+
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as conn:
+            conn.settimeout(1.0)
+            conn.connect(path)
+        return True
+    except OSError:
+        return False
+
+
+def serve_unix(path):
+    """Answer JSON-lines requests on a Unix domain socket until interrupted.
+
+    Raises OSError (EADDRINUSE) if another daemon is already listening on path.
+    """
+    import errno
+    import signal
+    import socketserver
+
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self):
+            for line in self.rfile:
+                if line.strip():
+                    self.wfile.write(_handle_line(line.decode("utf-8")).encode("utf-8"))
+                    self.wfile.flush()
+
+    if os.path.exists(path):
+        if _listening(path):
+            raise OSError(errno.EADDRINUSE, f"A daemon is already listening on {path}")
+        os.unlink(path)  # stale socket from a previous daemon
+    # Exit through the finally below on `kill` too, so the socket file is removed
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    with socketserver.ThreadingUnixStreamServer(path, Handler) as server:
+        server.daemon_threads = True
+        bound = os.stat(path)
+        try:
+            server.serve_forever()
+        except (KeyboardInterrupt, SystemExit):
+            pass
+        finally:
+            # Remove the socket file only while it is still ours: another
+            # daemon may have replaced it since
+            try:
+                current = os.stat(path)
+                if (current.st_dev, current.st_ino) == (bound.st_dev, bound.st_ino):
+                    os.unlink(path)
+            except FileNotFoundError:
+                pass
+
+
+def serve(socket_path=None):
+    """Warm every index, then serve on socket_path or on stdin/stdout"""
+    warm_indexes()
+    if socket_path:
+        serve_unix(socket_path)
+    else:
+        serve_stdio()
+
+
+# ============ CLIENT ============
+def request(payload, socket_path=DEFAULT_SOCKET):
+    """Send one request to a running daemon.
+
+    Returns the response dict, or None when no daemon is listening so the
+    caller can fall back to in-process execution.
+    """
+    if not socket_path:
+        return None
+    import socket
+
+    if not hasattr(socket, "AF_UNIX"):
+        return None
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as conn:
+            conn.settimeout(CLIENT_TIMEOUT)
+            conn.connect(socket_path)
+            conn.sendall((json.dumps(payload, ensure_ascii=False) + "\n").encode("utf-8"))
+            with conn.makefile("rb") as reader:
+                line = reader.readline()
+    except OSError:
+        return None
+    if not line:
+        return None
+    return json.loads(line)